@@ -1,43 +1,32 @@
 ##
 ## Import necessary modules for timing, state machines, and GPIO handling
+## Hardware libraries are imported inside setupHardware() so this module
+## can be imported without touching the hardware
 ##
 from time import sleep
 from datetime import datetime
 from statemachine import StateMachine, State
-import board
-import adafruit_ahtx0
-import digitalio
-import adafruit_character_lcd.character_lcd as characterlcd
-import serial
-from gpiozero import Button, PWMLED
 from threading import Thread
 from math import floor
 
 ## DEBUG flag - Enables verbose logging
 DEBUG = True
 
-## Create an I2C instance and initialize temperature/humidity sensor
-i2c = board.I2C()
-thSensor = adafruit_ahtx0.AHTx0(i2c)
-
-## Initialize Serial Communication (for external monitoring)
-ser = serial.Serial(
-    port='/dev/ttyS0',
-    baudrate=115200,
-    parity=serial.PARITY_NONE,
-    stopbits=serial.STOPBITS_ONE,
-    bytesize=serial.EIGHTBITS,
-    timeout=1
-)
-
-## Define LED indicators for heating (Red) and cooling (Blue)
-redLight = PWMLED(18)
-blueLight = PWMLED(23)
+## Hardware handles, created by setupHardware()
+thSensor = None
+ser = None
+redLight = None
+blueLight = None
+screen = None
 
 ## ManagedDisplay Class - Controls the LCD Display
 class ManagedDisplay():
     def __init__(self):
         """Initialize the LCD display with GPIO mappings"""
+        import board
+        import digitalio
+        import adafruit_character_lcd.character_lcd as characterlcd
+
         self.lcd_rs = digitalio.DigitalInOut(board.D17)
         self.lcd_en = digitalio.DigitalInOut(board.D27)
         self.lcd_d4 = digitalio.DigitalInOut(board.D5)
@@ -69,9 +58,6 @@ class ManagedDisplay():
         self.lcd.clear()
         self.lcd.message = message
 
-## Initialize LCD Display
-screen = ManagedDisplay()
-
 ## TemperatureMachine Class - Handles thermostat states
 class TemperatureMachine(StateMachine):
     """State machine for thermostat operation"""
@@ -192,27 +178,64 @@ class TemperatureMachine(StateMachine):
 
         screen.cleanupDisplay()
 
-## Initialize State Machine
-tsm = TemperatureMachine()
-tsm.run()
-
-## Configure GPIO Buttons
-greenButton = Button(24)
-greenButton.when_pressed = tsm.processTempStateButton
-
-redButton = Button(25)
-redButton.when_pressed = tsm.processTempIncButton
-
-blueButton = Button(12)
-blueButton.when_pressed = tsm.processTempDecButton
-
-## Main loop
-repeat = True
-while repeat:
-    try:
-        sleep(30)
-    except KeyboardInterrupt:
-        print("Cleaning up. Exiting...")
-        repeat = False
-        tsm.endDisplay = True
-        sleep(1)
+def setupHardware():
+    """Initialize the sensor, serial port, LEDs and LCD"""
+    global thSensor, ser, redLight, blueLight, screen
+    import board
+    import adafruit_ahtx0
+    import serial
+    from gpiozero import PWMLED
+
+    ## Create an I2C instance and initialize temperature/humidity sensor
+    thSensor = adafruit_ahtx0.AHTx0(board.I2C())
+
+    ## Initialize Serial Communication (for external monitoring)
+    ser = serial.Serial(
+        port='/dev/ttyS0',
+        baudrate=115200,
+        parity=serial.PARITY_NONE,
+        stopbits=serial.STOPBITS_ONE,
+        bytesize=serial.EIGHTBITS,
+        timeout=1
+    )
+
+    ## Define LED indicators for heating (Red) and cooling (Blue)
+    redLight = PWMLED(18)
+    blueLight = PWMLED(23)
+
+    ## Initialize LCD Display
+    screen = ManagedDisplay()
+
+def main():
+    """Set up hardware, start the thermostat and wait for Ctrl+C"""
+    from gpiozero import Button
+
+    setupHardware()
+
+    ## Initialize State Machine
+    tsm = TemperatureMachine()
+    tsm.run()
+
+    ## Configure GPIO Buttons
+    greenButton = Button(24)
+    greenButton.when_pressed = tsm.processTempStateButton
+
+    redButton = Button(25)
+    redButton.when_pressed = tsm.processTempIncButton
+
+    blueButton = Button(12)
+    blueButton.when_pressed = tsm.processTempDecButton
+
+    ## Main loop
+    repeat = True
+    while repeat:
+        try:
+            sleep(30)
+        except KeyboardInterrupt:
+            print("Cleaning up. Exiting...")
+            repeat = False
+            tsm.endDisplay = True
+            sleep(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,48 @@
 # thermostat_controller.py
 # Smart Thermostat Controller using Raspberry Pi GPIO, LCD, and AHT20 Sensor
 # Enhanced with config loading, persistent storage, CSV logging, and robust error handling
+#
+# Importing this module has no hardware side effects: GPIO, I2C, LCD and serial
+# libraries are imported and devices initialised only when main() runs, so
+# tooling and tests can import it without a Raspberry Pi. It still needs
+# python-statemachine and the project modules (including data_logger.py).
 
 # === Imports ===
 import time
-import json
+BOOT_TIME = time.perf_counter()  # Reference point for the startup report
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from threading import Thread
-from math import floor
-
-# Hardware libraries
-import board
-import adafruit_ahtx0
-import digitalio
-import adafruit_character_lcd.character_lcd as characterlcd
-from gpiozero import Button, PWMLED
-import serial
+from threading import Event, Thread
+
 from statemachine import StateMachine, State
 
 # Project modules
 from constants import *
 from utils import set_led_state
-from setpoint_storage import save_setpoint, load_setpoint
+from config_schema import default_config, load_config
+from setpoint_storage import load_setpoint, DebouncedSetpointWriter
 from data_logger import log_temperature
-
-# === Load Config ===
-# Load parameters from JSON config file (e.g., polling interval, default set point)
-with open("config.json") as f:
-    config = json.load(f)
-
-DEFAULT_SETPOINT = config.get("default_set_point", 72)
-TEMP_POLL_INTERVAL = config.get("temp_poll_interval", 1)
-SERIAL_LOG_INTERVAL = config.get("serial_log_interval", 30)
+from poll_scheduler import AdaptivePollScheduler
+from telemetry_protocol import TelemetryBatcher
+from hysteresis_control import HysteresisController
+from loop_metrics import LoopMetrics, start_http_server, start_json_dump
+from startup_report import StartupReport
+from sqlite_store import ThermostatHistory
+
+# Config keys and defaults live in config_schema.CONFIG_SCHEMA. Notable groups:
+# - serial_protocol: "binary" sends framed batches (see telemetry_protocol.py),
+#   "ascii" sends one newline-terminated state,temp,setpoint line per report.
+#   By default 10 reports (one every 30 s) share a frame, sent at least every 5 minutes.
+#   For a higher report rate lower serial_log_interval and raise serial_batch_size.
+# - poll_*: adaptive polling, fast while temperature moves, backs off while stable.
+# - control_*: heat/cool demand switches only outside set_point ± deadband/2
+#   and is held for at least the minimum on/off time (seconds).
+# - metrics_*: Prometheus text on http://127.0.0.1:<metrics_port>/metrics
+#   and/or a periodic JSON dump; the endpoint is off unless metrics_port is set.
+# - history_*: SQLite time-series store with minute/hour rollups (sqlite_store.py);
+#   set history_db to null to keep only the CSV log.
 
 # === LCD Display Handler ===
 class ManagedDisplay:
@@ -40,6 +51,10 @@ class ManagedDisplay:
     """
 
     def __init__(self):
+        import board
+        import digitalio
+        import adafruit_character_lcd.character_lcd as characterlcd
+
         # Initialize LCD pin mapping
         self.lcd_rs = digitalio.DigitalInOut(board.D17)
         self.lcd_en = digitalio.DigitalInOut(board.D27)
@@ -89,71 +104,160 @@ class TemperatureMachine(StateMachine):
     cool = State()
     cycle = (off.to(heat) | heat.to(cool) | cool.to(off))
 
-    def __init__(self, screen, sensor, red_led, blue_led, serial_port):
-        self.set_point = load_setpoint(DEFAULT_SETPOINT)  # Load saved or default set point
+    def __init__(self, screen, sensor, red_led, blue_led, serial_port, config=None):
+        self.config = config = config or default_config()
+        self.set_point = load_setpoint(config["default_set_point"])  # Load saved or default set point
+        self.setpoint_writer = DebouncedSetpointWriter(quiet_period=config["setpoint_save_delay"])
         self.screen = screen
         self.sensor = sensor
         self.red_led = red_led
         self.blue_led = blue_led
+        self.led_modes = [None, None]  # Last (red, blue) modes sent; None until first set
         self.serial = serial_port
+        self.telemetry = TelemetryBatcher(
+            serial_port, config["serial_batch_size"], config["serial_max_delay"]
+        )
         self.end_display = False  # Controls thread shutdown
+        self.temp = -999.0  # Latest reading, shown by the LCD thread
+        self.first_reading = Event()  # Set after the first sensor read completes
+        self.history = None
+        if config["history_db"]:
+            self.history = ThermostatHistory(config["history_db"], config["history_batch_size"])
+        self.metrics = LoopMetrics()
+        self.control = HysteresisController(
+            config["control_deadband"], config["control_min_on_time"], config["control_min_off_time"]
+        )
+        self.started_at = time.monotonic()
+        self.scheduler = AdaptivePollScheduler(
+            min_interval=config["temp_poll_interval"],
+            max_interval=config["poll_max_interval"],
+            backoff=config["poll_backoff"],
+            stable_delta=config["poll_stable_delta"],
+            near_band=config["poll_near_band"],
+        )
         super().__init__()
         self._start_display_thread()
 
     def _start_display_thread(self):
         """
-        Launch background thread to update display and perform logging.
+        Launch background threads for the control loop and the LCD.
         """
         Thread(target=self._manage_display, daemon=True).start()
+        Thread(target=self._refresh_lcd, daemon=True).start()
 
-    def _manage_display(self):
+    def _refresh_lcd(self):
         """
-        Periodically update the LCD, log to CSV/serial, and control LEDs.
+        Redraw the LCD with the latest reading on a fixed temp_poll_interval timer.
+        The sensor poll interval backs off while the temperature is stable, so the
+        screen runs separately to keep its clock current and its temp/state
+        alternation at 5 refreshes each.
         """
-        counter = 1
+        refresh_interval = self.config["temp_poll_interval"]
         lcd_cycle = 1
 
         while not self.end_display:
-            now = datetime.now().strftime('%b %d %H:%M:%S')
-            temp = self.get_temp_f()
-
-            # Alternate between temp and state display
-            if temp == -999.0:
-                line = "Sensor Error\nCheck Wiring"
-            elif lcd_cycle < 6:
-                line = f"{now}\nTemp: {temp:.1f}°F"
-            else:
-                line = f"{now}\nState:{self.current_state.id} | SP:{self.set_point}°F"
+            if self.first_reading.is_set():
+                now = datetime.now().strftime('%b %d %H:%M:%S')
+                temp = self.temp
+
+                # Alternate between temp and state display
+                if temp == -999.0:
+                    line = "Sensor Error\nCheck Wiring"
+                elif lcd_cycle < 6:
+                    line = f"{now}\nTemp: {temp:.1f}°F"
+                else:
+                    line = f"{now}\nState:{self.current_state.id} | SP:{self.set_point}°F"
+
+                with self.metrics.stage("lcd_write"):
+                    self.screen.update_screen(line)
+                lcd_cycle = (lcd_cycle % 10) + 1
+            time.sleep(refresh_interval)
+
+        # Cleanup when exiting
+        self.screen.cleanup()
+
+    def _manage_display(self):
+        """
+        Read the sensor on the adaptive poll interval, log to CSV/serial,
+        and control LEDs.
+        """
+        serial_log_interval = self.config["serial_log_interval"]
+        last_serial_log = time.monotonic()
 
-            self.screen.update_screen(line)
+        while not self.end_display:
+            self.metrics.loop_tick()
+            with self.metrics.stage("sensor_read"):
+                temp = self.get_temp_f()
+            self.temp = temp
+            self.first_reading.set()
 
             # Log only valid readings
             if temp != -999.0:
-                log_temperature(self.current_state.id, temp, self.set_point)
-                if counter % SERIAL_LOG_INTERVAL == 0:
-                    self._log_to_serial(temp)
-                    counter = 0
-
-            counter += 1
-            lcd_cycle = (lcd_cycle % 10) + 1
-            self.update_leds(temp)
-
-            time.sleep(TEMP_POLL_INTERVAL)
+                with self.metrics.stage("csv_log"):
+                    log_temperature(self.current_state.id, temp, self.set_point)
+                if self.history is not None:
+                    with self.metrics.stage("history_write"):
+                        self._log_to_history(temp)
+                # Time-based so the report rate does not depend on the poll interval
+                if time.monotonic() - last_serial_log >= serial_log_interval:
+                    with self.metrics.stage("serial_write"):
+                        self._log_to_serial(temp)
+                    last_serial_log = time.monotonic()
+
+            with self.metrics.stage("led_update"):
+                self.update_leds(temp)
+
+            interval = self.scheduler.record_reading(temp, self.set_point)
+            self.metrics.set_expected_interval(interval)
+            if self.scheduler.wait():
+                # Woken early by a button press; not a scheduling jitter sample
+                self.metrics.set_expected_interval(None)
 
         # Cleanup when exiting
-        self.screen.cleanup()
+        if self.config["serial_protocol"] == "binary":
+            try:
+                self.telemetry.flush()
+            except Exception as e:
+                if DEBUG:
+                    print(f"Serial write failed: {e}")
+        if self.history is not None:
+            try:
+                self.history.close()
+            except Exception as e:
+                if DEBUG:
+                    print(f"History write failed: {e}")
 
     def _log_to_serial(self, temp):
         """
         Sends thermostat state data to UART.
         """
         try:
-            output = f"{self.current_state.id},{temp:.1f},{self.set_point}"
-            self.serial.write(output.encode("utf-8"))
+            if self.config["serial_protocol"] == "binary":
+                self.telemetry.add(self.current_state.id, temp, self.set_point)
+            else:
+                output = f"{self.current_state.id},{temp:.1f},{self.set_point}\n"
+                self.serial.write(output.encode("utf-8"))
         except Exception as e:
+            self.metrics.inc("serial_errors")
             if DEBUG:
                 print(f"Serial write failed: {e}")
 
+    def _log_to_history(self, temp):
+        """
+        Queues the reading in the SQLite history. A failed write keeps the
+        batch queued for a later flush instead of stopping the loop; readings
+        dropped because that backlog is full are counted as history_dropped.
+        """
+        dropped = self.history.readings_dropped
+        try:
+            self.history.add(self.current_state.id, temp, self.set_point)
+        except Exception as e:
+            self.metrics.inc("history_errors")
+            if DEBUG:
+                print(f"History write failed: {e}")
+        if self.history.readings_dropped > dropped:
+            self.metrics.inc("history_dropped", self.history.readings_dropped - dropped)
+
     def get_temp_f(self):
         """
         Read and convert Celsius to Fahrenheit.
@@ -162,23 +266,48 @@ class TemperatureMachine(StateMachine):
         try:
             return (self.sensor.temperature * 9 / 5) + 32
         except Exception as e:
+            self.metrics.inc("sensor_errors")
             if DEBUG:
                 print(f"Sensor read failed: {e}")
             return -999.0
 
     def update_leds(self, temp):
         """
-        Turn LEDs on/off/pulse based on state and temp.
+        Turn LEDs on/off/pulse based on state and hysteresis demand.
+        set_led_state skips LEDs already in the requested mode, so a steady
+        state costs no GPIO calls and never restarts the pulse thread.
         """
-        set_led_state(self.red_led, "off")
-        set_led_state(self.blue_led, "off")
-        if temp == -999.0:
-            return  # Skip LED logic if reading failed
-
-        if self.current_state == self.heat:
-            set_led_state(self.red_led, "pulse" if temp < self.set_point else "on")
-        elif self.current_state == self.cool:
-            set_led_state(self.blue_led, "pulse" if temp > self.set_point else "on")
+        self.control.update(self.current_state.id, temp, self.set_point)
+        modes = self.control.led_modes()
+
+        for i, (led, mode) in enumerate(zip((self.red_led, self.blue_led), modes)):
+            if set_led_state(led, mode, self.led_modes[i]):
+                self.led_modes[i] = mode
+                self.metrics.inc("gpio_ops")
+                if mode == "pulse":
+                    self.metrics.inc("pulse_starts")
+
+        # What the previous always-reset logic would have done this tick
+        if temp != -999.0 and self.current_state.id in ("heat", "cool"):
+            self.metrics.inc("gpio_ops_legacy", 3)
+            if (temp < self.set_point) if self.current_state == self.heat else (temp > self.set_point):
+                self.metrics.inc("pulse_starts_legacy")
+        else:
+            self.metrics.inc("gpio_ops_legacy", 2)
+
+    def led_savings_per_hour(self):
+        """
+        GPIO operations and pulse thread restarts saved per hour compared
+        with resetting both LEDs on every tick.
+        """
+        hours = max(time.monotonic() - self.started_at, 1) / 3600
+        counters = self.metrics.snapshot()["counters"]
+        ops_saved = counters.get("gpio_ops_legacy", 0) - counters.get("gpio_ops", 0)
+        pulses_saved = counters.get("pulse_starts_legacy", 0) - counters.get("pulse_starts", 0)
+        return {
+            "gpio_ops_saved_per_hour": round(ops_saved / hours, 1),
+            "pulse_restarts_saved_per_hour": round(pulses_saved / hours, 1),
+        }
 
     def process_state_button(self):
         """
@@ -187,49 +316,126 @@ class TemperatureMachine(StateMachine):
         if DEBUG:
             print("Cycling temperature state")
         self.cycle()
+        self.scheduler.wake()
 
     def process_temp_inc(self):
         """
-        Increase set point and save.
+        Increase set point and schedule a save.
         """
         self.set_point += 1
-        save_setpoint(self.set_point)
+        self.setpoint_writer.request(self.set_point)
+        self.scheduler.wake()
         if DEBUG:
             print(f"Set point increased to {self.set_point}")
 
     def process_temp_dec(self):
         """
-        Decrease set point and save.
+        Decrease set point and schedule a save.
         """
         self.set_point -= 1
-        save_setpoint(self.set_point)
+        self.setpoint_writer.request(self.set_point)
+        self.scheduler.wake()
         if DEBUG:
             print(f"Set point decreased to {self.set_point}")
 
 # === System Initialization ===
 
-# Setup I2C and hardware
-i2c = board.I2C()
-sensor = adafruit_ahtx0.AHTx0(i2c)
-screen = ManagedDisplay()
-red_led = PWMLED(RED_LED_PIN)
-blue_led = PWMLED(BLUE_LED_PIN)
-serial_port = serial.Serial('/dev/ttyS0', 115200, timeout=1)
-
-# Create the thermostat FSM object
-thermostat = TemperatureMachine(screen, sensor, red_led, blue_led, serial_port)
-
-# Assign GPIO button callbacks
-Button(BUTTON_STATE_PIN).when_pressed = thermostat.process_state_button
-Button(BUTTON_INC_PIN).when_pressed = thermostat.process_temp_inc
-Button(BUTTON_DEC_PIN).when_pressed = thermostat.process_temp_dec
-
-# Keep the program running until interrupted
-try:
-    while True:
-        time.sleep(30)
-except KeyboardInterrupt:
-    thermostat.end_display = True
-    save_setpoint(thermostat.set_point)
-    print("Shutting down system gracefully...")
-    time.sleep(1)
+def _init_sensor():
+    import board
+    import adafruit_ahtx0
+    return adafruit_ahtx0.AHTx0(board.I2C())
+
+def _init_leds():
+    from gpiozero import PWMLED
+    return PWMLED(RED_LED_PIN), PWMLED(BLUE_LED_PIN)
+
+def _init_serial(config):
+    import serial
+    return serial.Serial(config["serial_port"], config["serial_baud"], timeout=1)
+
+def init_hardware(config, report):
+    """
+    Initialise the sensor, LCD, LEDs and serial port concurrently.
+
+    The devices are independent, so their library imports and bus setup
+    overlap instead of running back to back. Each device's time, including
+    its lazy imports, is recorded as its own phase in the startup report.
+    """
+    def timed(name, func, *args):
+        with report.phase(name):
+            return func(*args)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        sensor = pool.submit(timed, "sensor (I2C + AHT20)", _init_sensor)
+        screen = pool.submit(timed, "lcd", ManagedDisplay)
+        leds = pool.submit(timed, "pwm leds", _init_leds)
+        serial_port = pool.submit(timed, "serial port", _init_serial, config)
+        red_led, blue_led = leds.result()
+        return sensor.result(), screen.result(), red_led, blue_led, serial_port.result()
+
+def main(argv=None):
+    """
+    Load config, bring up hardware, start the thermostat and block until Ctrl+C.
+    """
+    parser = argparse.ArgumentParser(description="Smart thermostat controller")
+    parser.add_argument("--config", default="config.json", help="Path to config.json")
+    parser.add_argument("--startup-report", metavar="PATH",
+                        help="Also write the startup time breakdown to PATH as JSON")
+    args = parser.parse_args(argv)
+
+    report = StartupReport(BOOT_TIME)
+    report.mark("module imports done")
+
+    with report.phase("config"):
+        config = load_config(args.config)
+
+    with report.phase("hardware (concurrent)"):
+        sensor, screen, red_led, blue_led, serial_port = init_hardware(config, report)
+
+    # Create the thermostat FSM object
+    with report.phase("thermostat"):
+        thermostat = TemperatureMachine(screen, sensor, red_led, blue_led, serial_port, config)
+
+    # Expose loop metrics
+    if config["metrics_port"]:
+        try:
+            start_http_server(thermostat.metrics, config["metrics_port"])
+        except OSError as e:
+            # A busy port must not stop the thermostat itself from running
+            if DEBUG:
+                print(f"Metrics endpoint disabled: {e}")
+    if config["metrics_json_path"]:
+        start_json_dump(thermostat.metrics, config["metrics_json_path"], config["metrics_dump_interval"])
+
+    # Assign GPIO button callbacks
+    from gpiozero import Button
+    buttons = [Button(BUTTON_STATE_PIN), Button(BUTTON_INC_PIN), Button(BUTTON_DEC_PIN)]
+    buttons[0].when_pressed = thermostat.process_state_button
+    buttons[1].when_pressed = thermostat.process_temp_inc
+    buttons[2].when_pressed = thermostat.process_temp_dec
+
+    # Boot-to-first-reading
+    if thermostat.first_reading.wait(timeout=10):
+        report.mark("first reading")
+    if DEBUG:
+        print(report.format())
+    if args.startup_report:
+        report.save(args.startup_report)
+
+    # Keep the program running until interrupted
+    try:
+        while True:
+            time.sleep(30)
+    except KeyboardInterrupt:
+        thermostat.end_display = True
+        thermostat.scheduler.wake()
+        if DEBUG:
+            print(f"Polling stats: {thermostat.scheduler.stats()}")
+            print(f"LED savings: {thermostat.led_savings_per_hour()}")
+        thermostat.setpoint_writer.request(thermostat.set_point)
+        thermostat.setpoint_writer.close()  # Final flush of any pending set point
+        print("Shutting down system gracefully...")
+        time.sleep(1)
+
+if __name__ == "__main__":
+    main()
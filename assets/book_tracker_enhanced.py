@@ -1,13 +1,24 @@
-import sqlite3  # Import SQLite library for database interaction
+from sqlite_store import connect  # Shared, tuned SQLite connection helper
+
+DB_PATH = "books_enhanced.db"
+_conn = None
+
+# Function to return the shared database connection, opening it on first use
+def get_connection():
+    global _conn
+    if _conn is None:
+        _conn = connect(DB_PATH)  # Connect to (or create) the database file in WAL mode
+    return _conn
 
 # Function to create the books table if it doesn't exist
 def create_table():
-    conn = sqlite3.connect("books_enhanced.db")  # Connect to (or create) the database file
+    conn = get_connection()
     c = conn.cursor()
     # Create the books table with title, author, genre, and year fields
     c.execute("CREATE TABLE IF NOT EXISTS books (title TEXT NOT NULL, author TEXT, genre TEXT, year INTEGER)")
+    # Index title so delete_book's exact-match lookup avoids a full table scan
+    c.execute("CREATE INDEX IF NOT EXISTS idx_books_title ON books (title)")
     conn.commit()
-    conn.close()
 
 # Function to add a book entry to the database
 def add_book(title, author, genre, year):
@@ -16,39 +27,35 @@ def add_book(title, author, genre, year):
         print("Title cannot be empty.")
         return
 
-    conn = sqlite3.connect("books_enhanced.db")
+    conn = get_connection()
     c = conn.cursor()
     # Use parameterized SQL to prevent SQL injection
     c.execute("INSERT INTO books VALUES (?, ?, ?, ?)", (title, author, genre, year))
     conn.commit()
-    conn.close()
 
 # Function to retrieve and return all books from the database
 def view_books():
-    conn = sqlite3.connect("books_enhanced.db")
+    conn = get_connection()
     c = conn.cursor()
     c.execute("SELECT * FROM books")  # Fetch all records from the books table
     rows = c.fetchall()  # Store results in a list
-    conn.close()
     return rows
 
 # Function to delete a book based on title
 def delete_book(title):
-    conn = sqlite3.connect("books_enhanced.db")
+    conn = get_connection()
     c = conn.cursor()
     # Use parameterized query to safely delete book
     c.execute("DELETE FROM books WHERE title = ?", (title,))
     conn.commit()
-    conn.close()
 
 # Function to search for books that contain a specific keyword in the title
 def search_book(title):
-    conn = sqlite3.connect("books_enhanced.db")
+    conn = get_connection()
     c = conn.cursor()
     # Use wildcard with LIKE for flexible matching
     c.execute("SELECT * FROM books WHERE title LIKE ?", ('%' + title + '%',))
     rows = c.fetchall()
-    conn.close()
     return rows
 
 # Example usage block to demonstrate functionality
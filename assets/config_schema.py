@@ -0,0 +1,89 @@
+# config_schema.py
+# Schema, defaults and validation for the thermostat's config.json
+
+import json
+
+from constants import DEBUG
+from telemetry_protocol import MAX_RECORDS_PER_FRAME
+
+# key: (expected type(s), default, minimum value or tuple of allowed values, maximum value)
+CONFIG_SCHEMA = {
+    "default_set_point": ((int, float), 72, None, None),
+    "temp_poll_interval": ((int, float), 1, 0.01, None),
+    "serial_log_interval": ((int, float), 30, 0, None),
+    "setpoint_save_delay": ((int, float), 2.0, 0, None),
+    "serial_port": (str, "/dev/ttyS0", None, None),
+    "serial_baud": (int, 115200, 1, None),
+    "serial_protocol": (str, "binary", ("binary", "ascii"), None),
+    "serial_batch_size": (int, 10, 1, MAX_RECORDS_PER_FRAME),
+    "serial_max_delay": ((int, float), 300, 0, None),
+    "poll_max_interval": ((int, float), 30, 0.01, None),
+    "poll_backoff": ((int, float), 2.0, 1.0, None),
+    "poll_stable_delta": ((int, float), 0.2, 0, None),
+    "poll_near_band": ((int, float), 1.0, 0, None),
+    "control_deadband": ((int, float), 1.0, 0, None),
+    "control_min_on_time": ((int, float), 60, 0, None),
+    "control_min_off_time": ((int, float), 60, 0, None),
+    "metrics_port": (int, 0, 0, 65535),
+    "metrics_json_path": ((str, type(None)), None, None, None),
+    "metrics_dump_interval": ((int, float), 60, 1, None),
+    "history_db": ((str, type(None)), "thermostat_history.db", None, None),
+    "history_batch_size": (int, 60, 1, None),
+}
+
+
+def default_config():
+    """
+    Return a config dictionary containing every default value.
+    """
+    return {key: default for key, (_, default, _, _) in CONFIG_SCHEMA.items()}
+
+
+def validate_config(raw):
+    """
+    Check raw config values against CONFIG_SCHEMA and fill in defaults.
+
+    Raises ValueError listing every problem found, so a bad config.json is
+    reported in one go instead of failing on first use. Unknown keys (such as
+    settings from older config files) are ignored, with a notice in debug mode.
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("Config must be a JSON object.")
+
+    config = default_config()
+    problems = []
+    for key, value in raw.items():
+        if key not in CONFIG_SCHEMA:
+            if DEBUG:
+                print(f"Ignoring unknown config key {key!r}")
+            continue
+        types, _, rule, maximum = CONFIG_SCHEMA[key]
+        # bool is a subclass of int but is never a valid number here
+        if isinstance(value, bool) or not isinstance(value, types):
+            problems.append(f"{key!r} has invalid type {type(value).__name__}")
+        elif isinstance(rule, tuple) and value not in rule:
+            problems.append(f"{key!r} must be one of {', '.join(map(repr, rule))}")
+        elif isinstance(rule, (int, float)) and value < rule:
+            problems.append(f"{key!r} must be >= {rule}")
+        elif maximum is not None and value > maximum:
+            problems.append(f"{key!r} must be <= {maximum}")
+        else:
+            config[key] = value
+
+    if config["poll_max_interval"] < config["temp_poll_interval"]:
+        problems.append("'poll_max_interval' must be >= 'temp_poll_interval'")
+    if problems:
+        raise ValueError("Invalid config: " + "; ".join(problems))
+    return config
+
+
+def load_config(path="config.json"):
+    """
+    Load and validate the config file. A missing file means all defaults.
+    """
+    try:
+        with open(path) as f:
+            raw = json.load(f)
+    except FileNotFoundError:
+        return default_config()
+    return validate_config(raw)
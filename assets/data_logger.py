@@ -0,0 +1,27 @@
+# data_logger.py
+# Appends thermostat readings to a CSV log file
+
+import csv
+import os
+from datetime import datetime
+
+LOG_FILE = "thermostat_log.csv"
+LOG_FIELDS = ("timestamp", "state", "temperature_f", "set_point")
+
+
+def log_temperature(state, temp, set_point, path=LOG_FILE):
+    """
+    Append one reading to the CSV log, writing a header row if the file is new.
+
+    Parameters:
+    state (str): Current thermostat state ("off", "heat" or "cool")
+    temp (float): Current temperature in °F
+    set_point (float): Target temperature in °F
+    path (str): CSV file to append to
+    """
+    new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+    with open(path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(LOG_FIELDS)
+        writer.writerow((datetime.now().isoformat(timespec="seconds"), state, f"{temp:.1f}", set_point))
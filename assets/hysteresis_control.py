@@ -0,0 +1,86 @@
+# hysteresis_control.py
+# Heat/cool demand decisions with a deadband and minimum on/off times,
+# so the output does not flip every time the temperature crosses the set point.
+
+import time
+
+
+class HysteresisController:
+    """
+    Decides whether heating or cooling should be running.
+
+    In heat mode demand switches on below set_point - deadband / 2 and off
+    above set_point + deadband / 2 (mirrored for cool mode). Once switched,
+    demand is held for at least min_on_time / min_off_time seconds. Leaving
+    heat or cool mode drops demand immediately.
+    """
+
+    def __init__(self, deadband=1.0, min_on_time=60.0, min_off_time=60.0, clock=time.monotonic):
+        if deadband < 0 or min_on_time < 0 or min_off_time < 0:
+            raise ValueError("Deadband and minimum times must not be negative.")
+        self.deadband = deadband
+        self.min_on_time = min_on_time
+        self.min_off_time = min_off_time
+        self._clock = clock
+
+        self.mode = "off"
+        self.demand = False
+        self.sensor_ok = False
+        self._last_switch = None
+        self.switches = 0
+
+    def update(self, mode, temp, set_point):
+        """
+        Return True if the current mode's equipment should be running.
+
+        Parameters:
+        mode (str): "off", "heat" or "cool"
+        temp (float): Current temperature in °F, or -999.0 if the read failed
+        set_point (float): Target temperature in °F
+        """
+        now = self._clock()
+        self.sensor_ok = temp != -999.0
+        if mode != self.mode:
+            self.mode = mode
+            if self.demand:
+                self._switch(False, now)
+
+        if mode == "off" or temp == -999.0:
+            if self.demand:
+                self._switch(False, now)
+            return self.demand
+
+        half_band = self.deadband / 2
+        if mode == "heat":
+            want_on, want_off = temp < set_point - half_band, temp > set_point + half_band
+        else:
+            want_on, want_off = temp > set_point + half_band, temp < set_point - half_band
+
+        held_for = None if self._last_switch is None else now - self._last_switch
+        if not self.demand and want_on:
+            if held_for is None or held_for >= self.min_off_time:
+                self._switch(True, now)
+        elif self.demand and want_off:
+            if held_for is None or held_for >= self.min_on_time:
+                self._switch(False, now)
+        return self.demand
+
+    def _switch(self, demand, now):
+        self.demand = demand
+        self._last_switch = now
+        self.switches += 1
+
+    def led_modes(self):
+        """
+        Return (red, blue) LED modes: pulse while the mode's equipment runs,
+        solid while the mode is active but idle, off otherwise.
+        Both are off after a failed sensor read.
+        """
+        if not self.sensor_ok:
+            return "off", "off"
+        active = "pulse" if self.demand else "on"
+        if self.mode == "heat":
+            return active, "off"
+        if self.mode == "cool":
+            return "off", active
+        return "off", "off"
@@ -0,0 +1,212 @@
+# loop_metrics.py
+# Lightweight instrumentation for the thermostat control loop.
+# Per-stage timers, loop period/jitter histograms and error counters,
+# exported as Prometheus text over HTTP or as a periodic JSON dump.
+
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Event, Lock, Thread
+
+from constants import DEBUG
+
+# Histogram bucket upper bounds in seconds
+STAGE_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+PERIOD_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0)
+JITTER_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram; observe() is a bisect and two additions.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self):
+        """
+        Return cumulative bucket counts keyed by upper bound, plus sum and count.
+        """
+        cumulative = []
+        running = 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            running += n
+            cumulative.append((bound, running))
+        return {"buckets": cumulative, "sum": self.total, "count": self.count}
+
+
+class LoopMetrics:
+    """
+    Collects timings for one control loop.
+
+    Wrap each stage of an iteration in `with metrics.stage("sensor_read"):`
+    and call loop_tick(expected_interval) once per iteration to record the
+    loop period and its jitter against the interval the loop meant to sleep.
+    """
+
+    def __init__(self, prefix="thermostat"):
+        self.prefix = prefix
+        self.stages = {}
+        self.counters = {}
+        self.loop_period = Histogram(PERIOD_BUCKETS)
+        self.loop_jitter = Histogram(JITTER_BUCKETS)
+        self._last_tick = None
+        self._expected = None
+        self._lock = Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time the enclosed block and record it under the given stage name.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                hist = self.stages.get(name)
+                if hist is None:
+                    hist = self.stages[name] = Histogram(STAGE_BUCKETS)
+                hist.observe(elapsed)
+
+    def loop_tick(self, expected_interval=None):
+        """
+        Mark the start of a loop iteration.
+
+        Parameters:
+        expected_interval (float): Seconds the loop intends to wait before the next tick
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if self._last_tick is not None:
+                period = now - self._last_tick
+                self.loop_period.observe(period)
+                if self._expected is not None:
+                    self.loop_jitter.observe(abs(period - self._expected))
+            self._last_tick = now
+            self._expected = expected_interval
+
+    def set_expected_interval(self, expected_interval):
+        """
+        Update the interval the current iteration intends to wait.
+        """
+        with self._lock:
+            self._expected = expected_interval
+
+    def inc(self, name, amount=1):
+        """
+        Increment a named counter (e.g. sensor_errors).
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """
+        Return all metrics as a JSON-serialisable dictionary.
+        """
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "counters": dict(self.counters),
+                "stages": {name: h.snapshot() for name, h in self.stages.items()},
+                "loop_period": self.loop_period.snapshot(),
+                "loop_jitter": self.loop_jitter.snapshot(),
+            }
+
+    def to_json(self):
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        snap = self.snapshot()
+        p = self.prefix
+        lines = []
+
+        for name, value in sorted(snap["counters"].items()):
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {value}")
+
+        def histogram(metric, data, labels=""):
+            for bound, count in data["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                sep = "," if labels else ""
+                lines.append(f'{metric}_bucket{{{labels}{sep}le="{le}"}} {count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{metric}_sum{suffix} {data['sum']}")
+            lines.append(f"{metric}_count{suffix} {data['count']}")
+
+        lines.append(f"# TYPE {p}_stage_seconds histogram")
+        for name, data in sorted(snap["stages"].items()):
+            histogram(f"{p}_stage_seconds", data, f'stage="{name}"')
+        lines.append(f"# TYPE {p}_loop_period_seconds histogram")
+        histogram(f"{p}_loop_period_seconds", snap["loop_period"])
+        lines.append(f"# TYPE {p}_loop_jitter_seconds histogram")
+        histogram(f"{p}_loop_jitter_seconds", snap["loop_jitter"])
+        return "\n".join(lines) + "\n"
+
+
+def start_http_server(metrics, port, host="127.0.0.1"):
+    """
+    Serve metrics.to_prometheus() on http://host:port/metrics from a daemon thread.
+    Returns the server so the caller can shut it down. Port 0 picks a free port
+    (see server.server_address). Raises OSError if the port cannot be bound.
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Keep scrapes out of the console
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_json_dump(metrics, path="metrics.json", interval=60.0):
+    """
+    Write metrics.to_json() to path every interval seconds from a daemon thread.
+    Each dump is written to a temporary file and renamed into place. A failed
+    write is counted as metrics_dump_errors and retried on the next interval.
+    Returns an Event; set it to stop dumping.
+    """
+    stop = Event()
+
+    def dump():
+        while not stop.wait(interval):
+            tmp_path = f"{path}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    f.write(metrics.to_json())
+                os.replace(tmp_path, path)
+            except OSError as e:
+                metrics.inc("metrics_dump_errors")
+                if DEBUG:
+                    print(f"Metrics dump failed: {e}")
+
+    Thread(target=dump, daemon=True).start()
+    return stop
@@ -0,0 +1,125 @@
+# poll_scheduler.py
+# Adaptive sensor polling for the thermostat control loop.
+# Polls quickly while the temperature is moving or near the set point and
+# backs off exponentially while the room is stable.
+
+import time
+from threading import Event, Lock
+
+
+class AdaptivePollScheduler:
+    """
+    Decides how long the control loop should sleep before the next sensor read.
+
+    The interval starts at min_interval. Each reading that is both stable
+    (changed by less than stable_delta since the previous reading) and outside
+    near_band of the set point multiplies the interval by backoff, up to
+    max_interval. Any other reading, or a call to wake(), snaps it back to
+    min_interval.
+    """
+
+    def __init__(self, min_interval=1.0, max_interval=30.0, backoff=2.0,
+                 stable_delta=0.2, near_band=1.0, baseline_interval=None,
+                 clock=time.monotonic):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Poll intervals must satisfy 0 < min_interval <= max_interval.")
+        if backoff < 1.0:
+            raise ValueError("Backoff factor must be >= 1.0.")
+
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.stable_delta = stable_delta
+        self.near_band = near_band
+        # Fixed interval the savings counters are measured against
+        self.baseline_interval = baseline_interval or min_interval
+        self._clock = clock
+
+        self.interval = min_interval
+        self._last_temp = None
+        self._wake_event = Event()
+        self._lock = Lock()
+
+        # Counters
+        self.started_at = clock()
+        self.reads = 0
+        self.wakeups = 0
+        self.early_wakeups = 0
+
+    def record_reading(self, temp, set_point):
+        """
+        Record a sensor reading and return the interval before the next one.
+
+        Parameters:
+        temp (float): Latest temperature in °F, or -999.0 if the read failed
+        set_point (float): Current thermostat set point in °F
+        """
+        with self._lock:
+            self.reads += 1
+
+            if temp == -999.0:
+                # Keep retrying quickly while the sensor is failing
+                self._last_temp = None
+                self.interval = self.min_interval
+                return self.interval
+
+            moving = self._last_temp is None or abs(temp - self._last_temp) >= self.stable_delta
+            near_set_point = abs(temp - set_point) <= self.near_band
+            self._last_temp = temp
+
+            if moving or near_set_point:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+            return self.interval
+
+    def wake(self):
+        """
+        Snap back to fast polling and interrupt the current wait.
+        Call this from button handlers and state transitions.
+        """
+        with self._lock:
+            self.interval = self.min_interval
+        self._wake_event.set()
+
+    def wait(self):
+        """
+        Sleep for the current interval, returning early if wake() is called.
+
+        Returns True if the wait was cut short by wake().
+        """
+        woken = self._wake_event.wait(self.interval)
+        self._wake_event.clear()
+        self.wakeups += 1
+        if woken:
+            self.early_wakeups += 1
+        return woken
+
+    def reads_avoided(self):
+        """
+        Number of sensor reads saved compared with polling at baseline_interval.
+        """
+        elapsed = self._clock() - self.started_at
+        return max(0, int(elapsed / self.baseline_interval) - self.reads)
+
+    def wakeups_per_hour(self):
+        """
+        Average loop wake-ups per hour since the scheduler was created.
+        """
+        elapsed = self._clock() - self.started_at
+        if elapsed <= 0:
+            return 0.0
+        return self.wakeups * 3600.0 / elapsed
+
+    def stats(self):
+        """
+        Return a dictionary snapshot of the scheduler counters.
+        """
+        return {
+            "interval": self.interval,
+            "reads": self.reads,
+            "reads_avoided": self.reads_avoided(),
+            "wakeups": self.wakeups,
+            "early_wakeups": self.early_wakeups,
+            "wakeups_per_hour": round(self.wakeups_per_hour(), 1),
+        }
@@ -0,0 +1,149 @@
+# setpoint_storage.py
+# Persists the thermostat set point across reboots.
+# Writes are atomic (write-temp-and-rename) and rapid changes from the
+# buttons are coalesced into a single write after a quiet period.
+
+import atexit
+import json
+import os
+import tempfile
+from threading import Condition, Lock, Thread
+
+from constants import DEBUG
+
+SETPOINT_FILE = "setpoint.json"
+SAVE_QUIET_PERIOD = 2.0   # Seconds without changes before a pending value is written
+
+
+def load_setpoint(default, path=SETPOINT_FILE):
+    """
+    Load the saved set point, or return the default if none is stored.
+
+    Parameters:
+    default (int): Value to use when the file is missing or unreadable
+    path (str): Location of the set point file
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)["set_point"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return default
+
+
+def save_setpoint(value, path=SETPOINT_FILE):
+    """
+    Atomically write the set point to disk.
+
+    The value is written to a temporary file in the same directory, flushed
+    to disk, then renamed over the target so a power loss never leaves a
+    half-written file behind.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".setpoint-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"set_point": value}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class DebouncedSetpointWriter:
+    """
+    Coalesces rapid set point changes and saves them from a background thread.
+
+    request() only records the latest value and returns immediately, so it is
+    safe to call from GPIO callbacks. The value is written once no further
+    request() has arrived for quiet_period seconds. close() (also registered
+    with atexit) always flushes any pending value before returning.
+    """
+
+    def __init__(self, path=SETPOINT_FILE, quiet_period=SAVE_QUIET_PERIOD):
+        self.path = path
+        self.quiet_period = quiet_period
+        self.writes = 0
+        self.requests = 0
+
+        self._pending = None
+        self._has_pending = False
+        self._generation = 0
+        self._closed = False
+        self._cond = Condition()
+        self._write_lock = Lock()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def request(self, value):
+        """
+        Schedule value to be saved after the quiet period.
+        """
+        with self._cond:
+            self._pending = value
+            self._has_pending = True
+            self._generation += 1
+            self.requests += 1
+            self._cond.notify()
+
+    def flush(self):
+        """
+        Write any pending value immediately.
+        """
+        with self._write_lock:
+            with self._cond:
+                if not self._has_pending:
+                    return
+                value = self._pending
+                self._has_pending = False
+            try:
+                save_setpoint(value, self.path)
+            except OSError:
+                # Keep the value pending unless a newer one has replaced it
+                with self._cond:
+                    if not self._has_pending:
+                        self._pending = value
+                        self._has_pending = True
+                raise
+            self.writes += 1
+
+    def close(self):
+        """
+        Stop the background thread and flush the final value.
+        Safe to call more than once.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                if not self._has_pending:
+                    self._cond.wait()
+                    continue
+
+                # Wait until no new request has arrived for a full quiet period
+                generation = self._generation
+                self._cond.wait(self.quiet_period)
+                if self._closed or generation != self._generation:
+                    continue
+
+            # Write outside the condition so request() never blocks on disk I/O
+            try:
+                self.flush()
+            except OSError as e:
+                if DEBUG:
+                    print(f"Set point save failed: {e}")
@@ -0,0 +1,198 @@
+# sqlite_store.py
+# Shared SQLite storage layer for the thermostat history and the book tracker.
+# connect() applies the tuning both need; ThermostatHistory keeps raw readings
+# plus per-minute and per-hour rollups that are updated as readings arrive.
+
+import math
+import sqlite3
+import time
+from threading import Lock
+
+# Rollup tables and their bucket width in seconds
+ROLLUPS = {"minute": 60, "hour": 3600}
+
+
+def connect(path):
+    """
+    Open a tuned SQLite connection.
+
+    WAL lets readers (dashboards, reports) run while the thermostat writes,
+    synchronous=NORMAL is durable across application crashes in WAL mode
+    without an fsync per commit, and busy_timeout waits for a short lock
+    instead of failing immediately.
+    """
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+class ThermostatHistory:
+    """
+    Time-series store for thermostat readings.
+
+    add() buffers readings in memory and writes them in one transaction once
+    batch_size readings are pending or the oldest is max_delay seconds old.
+    Each flush also folds the batch into the readings_minute and readings_hour
+    rollup tables, so range queries over months read a few thousand
+    pre-aggregated rows instead of every raw reading.
+
+    If a write fails (disk full, database locked) the readings stay queued and
+    add() retries at most once per max_delay. At most max_pending readings are
+    kept; beyond that the oldest are dropped and counted in readings_dropped.
+    """
+
+    def __init__(self, path="thermostat_history.db", batch_size=60, max_delay=60.0,
+                 max_pending=10000):
+        if max_pending < batch_size:
+            raise ValueError("max_pending must be at least batch_size.")
+        self.conn = connect(path)
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self._pending = []
+        self._oldest = None
+        self._retry_at = 0.0
+        self._lock = Lock()
+        self.readings_dropped = 0
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS readings ("
+                "ts REAL NOT NULL, state TEXT NOT NULL, temp REAL NOT NULL, set_point REAL NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_readings_ts ON readings (ts)")
+            for name in ROLLUPS:
+                self.conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS readings_{name} ("
+                    "bucket INTEGER PRIMARY KEY, count INTEGER NOT NULL, "
+                    "temp_sum REAL NOT NULL, temp_min REAL NOT NULL, temp_max REAL NOT NULL, "
+                    "heat_count INTEGER NOT NULL, cool_count INTEGER NOT NULL)"
+                )
+
+    def add(self, state, temp, set_point, ts=None):
+        """
+        Queue one reading; it is written on the next batch flush.
+        """
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append((time.time() if ts is None else ts, state, temp, set_point))
+            self._drop_overflow()
+            now = time.monotonic()
+            due = now >= self._retry_at and (
+                len(self._pending) >= self.batch_size or now - self._oldest >= self.max_delay
+            )
+        if due:
+            self.flush()
+
+    def add_many(self, records):
+        """
+        Queue (ts, state, temp, set_point) records, e.g. TelemetryRecord batches
+        from the serial decoder, and flush once.
+        """
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.extend((r[0], r[1], r[2], r[3]) for r in records)
+            self._drop_overflow()
+        self.flush()
+
+    def _drop_overflow(self):
+        # Caller holds the lock
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.readings_dropped += overflow
+
+    def flush(self):
+        """
+        Write pending readings and update the rollups in a single transaction.
+        If the transaction fails the readings stay queued and the error is raised.
+        """
+        with self._lock:
+            rows = self._pending
+            if not rows:
+                return
+            # Pushed back on failure, so add() does not retry on every reading
+            self._retry_at = time.monotonic() + self.max_delay
+            with self.conn:
+                self.conn.executemany("INSERT INTO readings VALUES (?, ?, ?, ?)", rows)
+                for name, width in ROLLUPS.items():
+                    self.conn.executemany(
+                        f"INSERT INTO readings_{name} VALUES (?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(bucket) DO UPDATE SET "
+                        "count = count + excluded.count, "
+                        "temp_sum = temp_sum + excluded.temp_sum, "
+                        "temp_min = min(temp_min, excluded.temp_min), "
+                        "temp_max = max(temp_max, excluded.temp_max), "
+                        "heat_count = heat_count + excluded.heat_count, "
+                        "cool_count = cool_count + excluded.cool_count",
+                        _aggregate(rows, width),
+                    )
+            self._pending = []
+            self._retry_at = 0.0
+
+    def query(self, start, end, resolution="hour"):
+        """
+        Return (bucket_start, count, avg_temp, min_temp, max_temp, heat_fraction,
+        cool_fraction) rows for every bucket that overlaps start <= time < end.
+
+        Parameters:
+        start, end (float): Epoch seconds
+        resolution (str): "minute" or "hour"
+        """
+        if resolution not in ROLLUPS:
+            raise ValueError(f"Resolution must be one of {', '.join(ROLLUPS)}.")
+        self.flush()
+        width = ROLLUPS[resolution]
+        c = self.conn.execute(
+            "SELECT bucket * ?, count, temp_sum / count, temp_min, temp_max, "
+            "CAST(heat_count AS REAL) / count, CAST(cool_count AS REAL) / count "
+            f"FROM readings_{resolution} WHERE bucket >= ? AND bucket < ? ORDER BY bucket",
+            (width, math.floor(start / width), math.ceil(end / width)),
+        )
+        return c.fetchall()
+
+    def raw(self, start, end):
+        """
+        Return raw (ts, state, temp, set_point) readings for start <= ts < end.
+        """
+        self.flush()
+        c = self.conn.execute(
+            "SELECT ts, state, temp, set_point FROM readings WHERE ts >= ? AND ts < ? ORDER BY ts",
+            (start, end),
+        )
+        return c.fetchall()
+
+    def close(self):
+        """
+        Flush pending readings and close the connection.
+        """
+        self.flush()
+        self.conn.close()
+
+
+def _aggregate(rows, width):
+    """
+    Pre-aggregate a batch per bucket so each rollup row is upserted once.
+    """
+    buckets = {}
+    for ts, state, temp, _ in rows:
+        bucket = int(ts // width)
+        agg = buckets.get(bucket)
+        if agg is None:
+            buckets[bucket] = [bucket, 1, temp, temp, temp, state == "heat", state == "cool"]
+        else:
+            agg[1] += 1
+            agg[2] += temp
+            agg[3] = min(agg[3], temp)
+            agg[4] = max(agg[4], temp)
+            agg[5] += state == "heat"
+            agg[6] += state == "cool"
+    return [tuple(agg) for agg in buckets.values()]
@@ -0,0 +1,73 @@
+# startup_report.py
+# Records how long each startup phase takes so boot-to-first-reading time
+# can be tracked, in the spirit of `python -X importtime`.
+
+import json
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+
+class StartupReport:
+    """
+    Collects named startup phases measured against a common start time.
+
+    phase() may be used from several threads at once, so devices that are
+    initialised concurrently each get their own row. mark() records a
+    milestone (e.g. "first_reading") as the time elapsed since start.
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.phases = []      # (name, offset, duration)
+        self.milestones = {}
+        self._lock = Lock()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Time the enclosed block as one startup phase.
+        """
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.phases.append((name, begin - self.start, end - begin))
+
+    def mark(self, name):
+        """
+        Record a milestone at the current time.
+        """
+        with self._lock:
+            self.milestones[name] = time.perf_counter() - self.start
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "phases": [
+                    {"name": name, "offset_ms": round(offset * 1000, 2), "duration_ms": round(duration * 1000, 2)}
+                    for name, offset, duration in sorted(self.phases, key=lambda p: p[1])
+                ],
+                "milestones_ms": {name: round(t * 1000, 2) for name, t in self.milestones.items()},
+            }
+
+    def format(self):
+        """
+        Return a table of phases ordered by start offset, then the milestones.
+        """
+        data = self.to_dict()
+        lines = [f"{'start ms':>9} | {'self ms':>9} | phase"]
+        for p in data["phases"]:
+            lines.append(f"{p['offset_ms']:>9.1f} | {p['duration_ms']:>9.1f} | {p['name']}")
+        for name, t in data["milestones_ms"].items():
+            lines.append(f"{t:>9.1f} | {'':>9} | * {name}")
+        return "\n".join(lines)
+
+    def save(self, path):
+        """
+        Write the report as JSON.
+        """
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
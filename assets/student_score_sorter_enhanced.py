@@ -2,50 +2,94 @@ import time  # For performance benchmarking
 from bisect import bisect_left  # Efficient binary search support
 from collections import defaultdict  # Hash map structure for grouping
 
+# Default key: the score in a (name, score) tuple.
+# Pass key= to order by another field or a composite key; see student_sort_engine.py
+# for multi-column sorts with mixed ascending/descending keys and cached orderings.
+def score_key(x):
+    return x[1]
+
 # Merge Sort implementation for sorting list of tuples by score
-def merge_sort(arr):
+# Each key is computed once up front; the recursion merges (key, record) pairs
+# so comparisons index the precomputed key instead of calling key() again.
+def merge_sort(arr, key=score_key):
     if len(arr) <= 1:
         return arr
-    mid = len(arr) // 2
-    left = merge_sort(arr[:mid])
-    right = merge_sort(arr[mid:])
-    return merge(left, right)
+    decorated = _merge_sort_decorated([(key(x), x) for x in arr])
+    return [x for _, x in decorated]
+
+def _merge_sort_decorated(pairs):
+    if len(pairs) <= 1:
+        return pairs
+    mid = len(pairs) // 2
+    return _merge_decorated(_merge_sort_decorated(pairs[:mid]), _merge_sort_decorated(pairs[mid:]))
 
-def merge(left, right):
+# Stable merge of (key, record) pairs, with the current head
+# of each side and its key held in locals to keep the inner loop short
+def _merge_decorated(left, right):
     result = []
+    append = result.append
+    n, m = len(left), len(right)
     i = j = 0
-    while i < len(left) and j < len(right):
-        if left[i][1] <= right[j][1]:
-            result.append(left[i])
+    a, b = left[0], right[0]
+    ka, kb = a[0], b[0]
+    while True:
+        if ka <= kb:
+            append(a)
             i += 1
+            if i == n:
+                result.extend(right[j:])
+                return result
+            a = left[i]
+            ka = a[0]
         else:
-            result.append(right[j])
+            append(b)
             j += 1
-    result.extend(left[i:])
-    result.extend(right[j:])
-    return result
+            if j == m:
+                result.extend(left[i:])
+                return result
+            b = right[j]
+            kb = b[0]
+
+# Merge two lists already sorted by key, calling key() once per record
+def merge(left, right, key=score_key):
+    if not left or not right:
+        return left + right
+    merged = _merge_decorated([(key(x), x) for x in left], [(key(x), x) for x in right])
+    return [x for _, x in merged]
 
 # New algorithm: Quick Sort implementation
-def quick_sort(arr):
+# Median-of-three pivot keeps presorted and reverse-sorted input at O(n log n),
+# and the three-way split puts every duplicate score in one "equal" bucket,
+# so rosters with many tied scores do not degrade to O(n²).
+# Each bucket keeps input order, which makes the sort stable.
+def quick_sort(arr, key=score_key):
     if len(arr) <= 1:
         return arr
-    pivot = arr[0]
-    less = [x for x in arr[1:] if x[1] <= pivot[1]]
-    greater = [x for x in arr[1:] if x[1] > pivot[1]]
-    return quick_sort(less) + [pivot] + quick_sort(greater)
+    keys = [key(x) for x in arr]
+    return [arr[i] for i in _quick_sort_indices(list(range(len(arr))), keys)]
+
+def _quick_sort_indices(idx, keys):
+    if len(idx) <= 1:
+        return idx
+    first, middle, last = keys[idx[0]], keys[idx[len(idx) // 2]], keys[idx[-1]]
+    pivot = sorted((first, middle, last))[1]
+    less = [i for i in idx if keys[i] < pivot]
+    equal = [i for i in idx if keys[i] == pivot]
+    greater = [i for i in idx if keys[i] > pivot]
+    return _quick_sort_indices(less, keys) + equal + _quick_sort_indices(greater, keys)
 
 # Binary Search using bisect for sorted list of tuples
-def binary_search(data, target):
-    idx = bisect_left([x[1] for x in data], target)
-    if idx < len(data) and data[idx][1] == target:
+def binary_search(data, target, key=score_key):
+    idx = bisect_left([key(x) for x in data], target)
+    if idx < len(data) and key(data[idx]) == target:
         return data[idx]
     return None  # Not found
 
 # New data structure: Hash map to group students by score
-def group_students_by_score(students):
+def group_students_by_score(students, key=score_key):
     grouped = defaultdict(list)
-    for name, score in students:
-        grouped[score].append(name)
+    for student in students:
+        grouped[key(student)].append(student[0])
     return grouped
 
 # Utility function to print list of student-score pairs
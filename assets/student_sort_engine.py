@@ -0,0 +1,168 @@
+import time  # For performance benchmarking
+from bisect import bisect_left, bisect_right  # Range search on precomputed key columns
+from collections import defaultdict  # Hash map structure for grouping
+
+# Multi-key sort, search and group engine for student records.
+# Records can be tuples such as ("Alice", 91, 84) with field names supplied
+# separately, or dicts such as {"name": "Alice", "math": 91}.
+
+
+# Parse one sort key: "score" (ascending), "-score" (descending),
+# or an explicit (field, descending) pair
+def parse_key(key):
+    if isinstance(key, tuple):
+        return key[0], bool(key[1])
+    if isinstance(key, str) and key.startswith("-"):
+        return key[1:], True
+    return key, False
+
+
+# Stable multi-pass sort of record positions.
+# Sorting by the least significant key first and the most significant key last
+# gives a composite ordering, and works for descending strings where
+# negating the key is not possible. Python's sort stays stable with reverse=True.
+def sort_permutation(columns, keys):
+    if not keys:
+        raise ValueError("At least one sort key is required.")
+    perm = list(range(len(columns[keys[0][0]])))
+    for field, descending in reversed(keys):
+        perm.sort(key=columns[field].__getitem__, reverse=descending)
+    return perm
+
+
+# Reorder records using a permutation returned by sort_permutation
+def apply_permutation(records, perm):
+    return [records[i] for i in perm]
+
+
+class SortEngine:
+
+    # records: list of tuples or dicts
+    # fields: names for tuple positions, e.g. ("name", "math", "science")
+    def __init__(self, records, fields=None):
+        self.fields = {name: i for i, name in enumerate(fields)} if fields else None
+        self._records = list(records)
+        self._columns = {}       # field -> decorated key column
+        self._orderings = {}     # parsed key tuple -> permutation
+        self._ordered = {}       # parsed key tuple -> records in that order
+        self._groups = {}        # field tuple -> grouped dict
+        self._sorted_columns = {}  # field -> column values in ascending order
+        self.sorts = 0           # Number of sorts actually performed (cache misses)
+
+    @property
+    def records(self):
+        return self._records
+
+    # Replace the roster; cached columns, orderings and groups are discarded
+    def set_records(self, records):
+        self._records = list(records)
+        self._invalidate()
+
+    def add(self, record):
+        self._records.append(record)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._columns.clear()
+        self._orderings.clear()
+        self._ordered.clear()
+        self._groups.clear()
+        self._sorted_columns.clear()
+
+    # Decorated key column: each record's field value extracted once and reused
+    # by every ordering, search and group that mentions the field
+    def column(self, field):
+        col = self._columns.get(field)
+        if col is None:
+            index = self.fields[field] if self.fields and field in self.fields else field
+            col = self._columns[field] = [r[index] for r in self._records]
+        return col
+
+    # Return the cached permutation for a composite key, sorting only on a cache miss.
+    # With no keys the records keep their current order (identity permutation).
+    def permutation(self, *keys):
+        parsed = tuple(parse_key(k) for k in keys)
+        if not parsed:
+            return list(range(len(self._records)))
+        perm = self._orderings.get(parsed)
+        if perm is None:
+            columns = {field: self.column(field) for field, _ in parsed}
+            perm = self._orderings[parsed] = sort_permutation(columns, parsed)
+            self.sorts += 1
+        return perm
+
+    # Records ordered by a composite key, e.g. order("-score", "name").
+    # The returned list is cached and shared; copy it before modifying.
+    def order(self, *keys):
+        parsed = tuple(parse_key(k) for k in keys)
+        ordered = self._ordered.get(parsed)
+        if ordered is None:
+            ordered = self._ordered[parsed] = apply_permutation(self._records, self.permutation(*keys))
+        return ordered
+
+    # All records whose field equals value, found by binary search on the
+    # ascending ordering of that field
+    def search(self, field, value):
+        perm = self.permutation(field)
+        col = self.column(field)
+        # Sorted copy of the column so bisect can search it directly
+        sorted_col = self._sorted_columns.get(field)
+        if sorted_col is None:
+            sorted_col = self._sorted_columns[field] = [col[i] for i in perm]
+        lo = bisect_left(sorted_col, value)
+        hi = bisect_right(sorted_col, value, lo)
+        return [self._records[i] for i in perm[lo:hi]]
+
+    # Hash map grouping by one or more fields; multi-field groups use tuple keys.
+    # The returned dict is cached and shared; copy it before modifying.
+    def group_by(self, *fields):
+        grouped = self._groups.get(fields)
+        if grouped is None:
+            grouped = defaultdict(list)
+            cols = [self.column(f) for f in fields]
+            if len(cols) == 1:
+                for value, record in zip(cols[0], self._records):
+                    grouped[value].append(record)
+            else:
+                for i, record in enumerate(self._records):
+                    grouped[tuple(c[i] for c in cols)].append(record)
+            # Plain dict, so looking up a missing value cannot add it to the cache
+            grouped = self._groups[fields] = dict(grouped)
+        return grouped
+
+
+# Main execution
+if __name__ == "__main__":
+    import random
+
+    fields = ("name", "math", "science")
+    roster = [
+        (f"Student{i:06d}", random.randint(50, 100), random.randint(50, 100))
+        for i in range(200000)
+    ]
+    engine = SortEngine(roster, fields)
+
+    start = time.perf_counter()
+    top = engine.order("-math", "name")
+    end = time.perf_counter()
+    print(f"Sort by math desc, name asc: {end - start:.6f} seconds")
+    print(top[:3])
+
+    start = time.perf_counter()
+    engine.order("-math", "name")
+    end = time.perf_counter()
+    print(f"Repeated query (cached): {end - start:.6f} seconds")
+
+    start = time.perf_counter()
+    engine.order("-science", "-math", "name")
+    end = time.perf_counter()
+    print(f"Sort by science desc, math desc, name asc: {end - start:.6f} seconds")
+
+    start = time.perf_counter()
+    expected = sorted(roster, key=lambda r: (-r[1], r[0]))
+    end = time.perf_counter()
+    print(f"Built-in sorted() for comparison: {end - start:.6f} seconds")
+    print(f"Matches built-in: {expected == top}")
+
+    print(f"Students with math 88: {len(engine.search('math', 88))}")
+    print(f"Groups by (math, science): {len(engine.group_by('math', 'science'))}")
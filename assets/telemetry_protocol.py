@@ -0,0 +1,277 @@
+# telemetry_protocol.py
+# Compact framed binary protocol for thermostat telemetry over UART,
+# plus a streaming host-side decoder.
+#
+# Frame layout (little-endian):
+#   sync      2 bytes  0xAA 0x55
+#   version   u8
+#   sequence  u16      increments per frame, wraps at 65536
+#   count     u8       number of records in the frame
+#   length    u16      payload length in bytes (count * RECORD_SIZE)
+#   payload   count records of: timestamp u32 (epoch s), milliseconds u16,
+#                               state u8, temp i16 (0.1 °F), set point i16 (0.1 °F)
+#   crc       u32      CRC-32 of header (version..length) + payload
+#
+# Version 2 added the milliseconds field so several readings per second keep
+# distinct timestamps.
+
+import struct
+import time
+import zlib
+from collections import namedtuple
+
+SYNC = b"\xAA\x55"
+PROTOCOL_VERSION = 2
+
+HEADER = struct.Struct("<BHBH")
+RECORD = struct.Struct("<IHBhh")
+CRC = struct.Struct("<I")
+RECORD_SIZE = RECORD.size
+MAX_RECORDS_PER_FRAME = 255
+MAX_PAYLOAD = MAX_RECORDS_PER_FRAME * RECORD_SIZE
+
+# A sequence jump larger than this (which includes going backwards, e.g. after
+# the thermostat restarts at 0) is treated as a resync rather than lost frames
+MAX_SEQUENCE_GAP = 1024
+
+STATE_CODES = {"off": 0, "heat": 1, "cool": 2}
+STATE_NAMES = {code: name for name, code in STATE_CODES.items()}
+
+TelemetryRecord = namedtuple("TelemetryRecord", ["timestamp", "state", "temp", "set_point"])
+
+
+def encode_frame(records, sequence):
+    """
+    Encode a list of TelemetryRecord into one framed packet.
+
+    Parameters:
+    records (list): Between 1 and MAX_RECORDS_PER_FRAME records
+    sequence (int): Frame sequence number (taken modulo 65536)
+    """
+    if not 0 < len(records) <= MAX_RECORDS_PER_FRAME:
+        raise ValueError(f"A frame holds 1 to {MAX_RECORDS_PER_FRAME} records.")
+
+    payload = b"".join(
+        RECORD.pack(
+            *divmod(round(r.timestamp * 1000), 1000),
+            STATE_CODES[r.state],
+            round(r.temp * 10),
+            round(r.set_point * 10),
+        )
+        for r in records
+    )
+    header = HEADER.pack(PROTOCOL_VERSION, sequence & 0xFFFF, len(records), len(payload))
+    return SYNC + header + payload + CRC.pack(zlib.crc32(header + payload))
+
+
+class TelemetryBatcher:
+    """
+    Collects readings on the thermostat side and writes them as batched frames.
+
+    A frame is written when batch_size readings are queued or when the oldest
+    queued reading is max_delay seconds old, whichever comes first.
+
+    Readings stay queued while the port fails and are sent as several frames
+    once it recovers. At most max_pending readings are kept; beyond that the
+    oldest are dropped and counted in records_dropped.
+    """
+
+    def __init__(self, serial_port, batch_size=10, max_delay=30.0, max_pending=1000,
+                 clock=time.monotonic):
+        if not 0 < batch_size <= MAX_RECORDS_PER_FRAME:
+            raise ValueError(f"batch_size must be between 1 and {MAX_RECORDS_PER_FRAME}.")
+        if max_pending < batch_size:
+            raise ValueError("max_pending must be at least batch_size.")
+        self.serial = serial_port
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self._clock = clock
+        self._pending = []
+        self._oldest = None
+        self.sequence = 0
+        self.frames_sent = 0
+        self.records_sent = 0
+        self.records_dropped = 0
+
+    def add(self, state, temp, set_point, timestamp=None):
+        """
+        Queue one reading and send a frame if the batch is full or stale.
+        """
+        if not self._pending:
+            self._oldest = self._clock()
+        self._pending.append(TelemetryRecord(
+            timestamp if timestamp is not None else time.time(), state, temp, set_point
+        ))
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:
+            del self._pending[:overflow]
+            self.records_dropped += overflow
+        if (len(self._pending) >= self.batch_size
+                or self._clock() - self._oldest >= self.max_delay):
+            self.flush()
+
+    def flush(self):
+        """
+        Send all queued readings as frames of at most batch_size records.
+        """
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            frame = encode_frame(batch, self.sequence)
+            # Only drop a batch once it is written, so a failed write is retried
+            self.serial.write(frame)
+            del self._pending[:len(batch)]
+            self.sequence = (self.sequence + 1) & 0xFFFF
+            self.frames_sent += 1
+            self.records_sent += len(batch)
+
+
+class FrameDecoder:
+    """
+    Incremental decoder for a byte stream of telemetry frames.
+
+    feed() accepts arbitrary chunks (partial frames, several frames, or line
+    noise) and returns the records of every complete, valid frame. Corrupt
+    frames are skipped by resynchronising on the next sync marker.
+
+    Sequence gaps up to MAX_SEQUENCE_GAP count as lost frames. A larger jump,
+    a repeated frame, or a jump to 0 (the thermostat restarted) counts as a
+    sequence resync instead.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._expected_sequence = None
+        self.frames = 0
+        self.records = 0
+        self.crc_errors = 0
+        self.lost_frames = 0
+        self.sequence_resyncs = 0
+        self.discarded_bytes = 0
+
+    def feed(self, data):
+        """
+        Add received bytes and return a list of decoded TelemetryRecord.
+        """
+        self._buffer += data
+        records = []
+        buf = self._buffer
+        pos = 0
+        header_end = len(SYNC) + HEADER.size
+
+        while True:
+            start = buf.find(SYNC, pos)
+            if start < 0:
+                # Keep a trailing byte in case it is the first half of a sync marker
+                # (never before pos, which may already be past a complete frame)
+                keep = max(pos, len(buf) - 1) if buf.endswith(SYNC[:1]) else len(buf)
+                self.discarded_bytes += keep - pos
+                pos = keep
+                break
+            self.discarded_bytes += start - pos
+            pos = start
+
+            if len(buf) - pos < header_end:
+                break
+            version, sequence, count, length = HEADER.unpack_from(buf, pos + len(SYNC))
+            if (version != PROTOCOL_VERSION or length != count * RECORD_SIZE
+                    or count == 0 or length > MAX_PAYLOAD):
+                pos += 1
+                continue
+
+            frame_end = pos + header_end + length + CRC.size
+            if len(buf) < frame_end:
+                break
+
+            body = bytes(buf[pos + len(SYNC):frame_end - CRC.size])
+            (crc,) = CRC.unpack_from(buf, frame_end - CRC.size)
+            if zlib.crc32(body) != crc:
+                self.crc_errors += 1
+                pos += 1
+                continue
+
+            if self._expected_sequence is not None:
+                gap = (sequence - self._expected_sequence) & 0xFFFF
+                if gap > MAX_SEQUENCE_GAP or (gap and sequence == 0):
+                    self.sequence_resyncs += 1
+                else:
+                    self.lost_frames += gap
+            self._expected_sequence = (sequence + 1) & 0xFFFF
+
+            for seconds, millis, state, temp, set_point in RECORD.iter_unpack(body[HEADER.size:]):
+                records.append(TelemetryRecord(
+                    seconds + millis / 1000, STATE_NAMES.get(state, str(state)), temp / 10, set_point / 10
+                ))
+            self.frames += 1
+            self.records += count
+            pos = frame_end
+
+        del buf[:pos]
+        return records
+
+    def stats(self):
+        """
+        Return a dictionary snapshot of the decoder counters.
+        """
+        return {
+            "frames": self.frames,
+            "records": self.records,
+            "crc_errors": self.crc_errors,
+            "lost_frames": self.lost_frames,
+            "sequence_resyncs": self.sequence_resyncs,
+            "discarded_bytes": self.discarded_bytes,
+        }
+
+
+def read_stream(stream, sink, decoder=None, chunk_size=4096):
+    """
+    Decode frames from a file-like byte stream until EOF and pass each
+    non-empty batch of records to sink(records).
+
+    Returns the decoder so the caller can inspect its counters.
+    """
+    decoder = decoder or FrameDecoder()
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        records = decoder.feed(data)
+        if records:
+            sink(records)
+    return decoder
+
+
+# Host-side entry point: decode frames from a serial port into CSV or SQLite
+if __name__ == "__main__":
+    import argparse
+    import csv
+    import serial
+
+    parser = argparse.ArgumentParser(description="Decode thermostat telemetry frames.")
+    parser.add_argument("port", help="Serial device, e.g. /dev/ttyUSB0")
+    parser.add_argument("--baud", type=int, default=115200)
+    parser.add_argument("--csv", default="telemetry.csv", help="Output CSV file")
+    parser.add_argument("--db", help="Write to this SQLite history database instead of CSV")
+    args = parser.parse_args()
+
+    if args.db:
+        from sqlite_store import ThermostatHistory
+        store = ThermostatHistory(args.db)
+        write_records = store.add_many
+    else:
+        out = open(args.csv, "a", newline="")
+        writer = csv.writer(out)
+
+        def write_records(records):
+            writer.writerows(records)
+            out.flush()
+
+    port = serial.Serial(args.port, args.baud, timeout=1)
+    decoder = FrameDecoder()
+    try:
+        while True:
+            records = decoder.feed(port.read(port.in_waiting or 1))
+            if records:
+                write_records(records)
+    except KeyboardInterrupt:
+        print(f"Decoder stats: {decoder.stats()}")
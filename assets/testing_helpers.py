@@ -0,0 +1,15 @@
+# testing_helpers.py
+# Shared fakes for the unit tests in "tests test_*.py"
+
+
+class FakeClock:
+    """
+    Virtual clock for code that takes a clock= callable, so intervals and
+    minimum times can be tested without sleeping. Advance it by setting now.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
@@ -0,0 +1,89 @@
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from config_schema import default_config, load_config, validate_config # type: ignore
+from data_logger import LOG_FIELDS, log_temperature # type: ignore
+from telemetry_protocol import MAX_RECORDS_PER_FRAME # type: ignore
+
+CONTROLLER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Thermostat_controller Update.py")
+
+
+# Define a test case class for config.json validation
+class TestConfigSchema(unittest.TestCase):
+
+    def test_missing_file_means_defaults(self):
+        self.assertEqual(load_config(os.path.join(tempfile.gettempdir(), "no-such-config.json")), default_config())
+
+    def test_valid_values_override_defaults(self):
+        config = validate_config({"serial_batch_size": 20, "serial_protocol": "ascii"})
+        self.assertEqual(config["serial_batch_size"], 20)
+        self.assertEqual(config["serial_protocol"], "ascii")
+        self.assertEqual(config["default_set_point"], default_config()["default_set_point"])
+
+    def test_unknown_keys_are_ignored(self):
+        """
+        Keys from older config files (e.g. LED modes) do not stop startup.
+        """
+        config = validate_config({"led_modes": {"heat": "pulse"}, "serial_baud": 9600})
+        self.assertNotIn("led_modes", config)
+        self.assertEqual(config["serial_baud"], 9600)
+
+    def test_bounds(self):
+        """
+        Values outside a key's minimum or maximum are rejected before they
+        reach the code that would fail on them.
+        """
+        validate_config({"serial_batch_size": MAX_RECORDS_PER_FRAME, "metrics_port": 65535})
+        for raw in ({"serial_batch_size": MAX_RECORDS_PER_FRAME + 1}, {"serial_batch_size": 0},
+                    {"metrics_port": 70000}, {"metrics_port": -1}):
+            with self.subTest(raw=raw):
+                with self.assertRaises(ValueError):
+                    validate_config(raw)
+
+    def test_every_problem_is_reported(self):
+        with self.assertRaises(ValueError) as cm:
+            validate_config({"serial_baud": "fast", "serial_protocol": "morse", "poll_backoff": True})
+        message = str(cm.exception)
+        for key in ("serial_baud", "serial_protocol", "poll_backoff"):
+            self.assertIn(key, message)
+
+    def test_load_config_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "config.json")
+            with open(path, "w") as f:
+                json.dump({"default_set_point": 68}, f)
+            self.assertEqual(load_config(path)["default_set_point"], 68)
+
+
+# Define a test case class for the CSV data logger
+class TestDataLogger(unittest.TestCase):
+
+    def test_header_written_once(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "log.csv")
+            log_temperature("heat", 68.44, 72, path)
+            log_temperature("off", 70.0, 72, path)
+            with open(path) as f:
+                rows = [line.rstrip("\r\n").split(",") for line in f]
+            self.assertEqual(rows[0], list(LOG_FIELDS))
+            self.assertEqual([r[1:] for r in rows[1:]], [["heat", "68.4", "72"], ["off", "70.0", "72"]])
+
+
+# Define a test case class for importing the controller without hardware
+class TestControllerImport(unittest.TestCase):
+
+    @unittest.skipUnless(importlib.util.find_spec("statemachine"), "requires python-statemachine")
+    def test_controller_imports_without_hardware(self):
+        """
+        Every project import resolves and no hardware library is needed at import time.
+        """
+        spec = importlib.util.spec_from_file_location("thermostat_controller", CONTROLLER_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        self.assertTrue(callable(module.main))
+
+# This allows us to run the tests if we execute this file directly
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+from hysteresis_control import HysteresisController # type: ignore
+from testing_helpers import FakeClock # type: ignore
+from utils import set_led_state # type: ignore
+
+
+class FakeLED:
+    """
+    Records every hardware call made on it.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def on(self):
+        self.calls.append("on")
+
+    def off(self):
+        self.calls.append("off")
+
+    def pulse(self):
+        self.calls.append("pulse")
+
+
+# Define a test case class for the heat/cool hysteresis controller
+class TestHysteresisController(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Controller with a 2°F deadband and 60 second minimum on/off times.
+        """
+        self.clock = FakeClock()
+        self.control = HysteresisController(deadband=2.0, min_on_time=60, min_off_time=60, clock=self.clock)
+
+    def test_deadband(self):
+        """
+        Heat demand starts below set_point - 1 and stops above set_point + 1,
+        holding its last value in between.
+        """
+        self.assertFalse(self.control.update("heat", 71.5, 72))
+        self.assertTrue(self.control.update("heat", 70.9, 72))
+        self.clock.now = 100
+        self.assertTrue(self.control.update("heat", 72.5, 72))
+        self.assertFalse(self.control.update("heat", 73.1, 72))
+        self.assertEqual(self.control.switches, 2)
+
+    def test_cool_mode_is_mirrored(self):
+        """
+        Cool demand starts above set_point + 1 and stops below set_point - 1.
+        """
+        self.assertFalse(self.control.update("cool", 72.5, 72))
+        self.assertTrue(self.control.update("cool", 73.1, 72))
+        self.clock.now = 100
+        self.assertFalse(self.control.update("cool", 70.9, 72))
+
+    def test_min_on_and_off_times(self):
+        """
+        Once switched, demand is held until the minimum time has passed even
+        if the temperature leaves the deadband.
+        """
+        self.assertTrue(self.control.update("heat", 60, 72))
+        self.clock.now = 30
+        self.assertTrue(self.control.update("heat", 80, 72))
+        self.clock.now = 60
+        self.assertFalse(self.control.update("heat", 80, 72))
+        self.clock.now = 90
+        self.assertFalse(self.control.update("heat", 60, 72))
+        self.clock.now = 120
+        self.assertTrue(self.control.update("heat", 60, 72))
+
+    def test_mode_change_drops_demand_at_once(self):
+        """
+        Leaving heat mode turns demand off immediately, ignoring min_on_time.
+        """
+        self.assertTrue(self.control.update("heat", 60, 72))
+        self.clock.now = 1
+        self.assertFalse(self.control.update("cool", 60, 72))
+        self.assertFalse(self.control.update("off", 60, 72))
+        self.assertEqual(self.control.led_modes(), ("off", "off"))
+
+    def test_led_modes(self):
+        """
+        The active mode's LED pulses while running and is solid while idle;
+        both are off after a failed sensor read.
+        """
+        self.control.update("heat", 60, 72)
+        self.assertEqual(self.control.led_modes(), ("pulse", "off"))
+        self.clock.now = 100
+        self.control.update("heat", 80, 72)
+        self.assertEqual(self.control.led_modes(), ("on", "off"))
+        self.control.update("cool", 72, 72)
+        self.assertEqual(self.control.led_modes(), ("off", "on"))
+        self.control.update("cool", -999.0, 72)
+        self.assertEqual(self.control.led_modes(), ("off", "off"))
+        self.assertFalse(self.control.demand)
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            HysteresisController(deadband=-1)
+
+
+# Define a test case class for LED updates
+class TestSetLedState(unittest.TestCase):
+
+    def test_skips_repeated_mode(self):
+        """
+        The hardware is only touched when the mode differs from the caller's
+        last mode, so a steady pulse is never restarted.
+        """
+        led = FakeLED()
+        self.assertTrue(set_led_state(led, "pulse"))
+        self.assertFalse(set_led_state(led, "pulse", "pulse"))
+        self.assertTrue(set_led_state(led, "off", "pulse"))
+        self.assertEqual(led.calls, ["pulse", "off"])
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            set_led_state(FakeLED(), "blink")
+
+# This allows us to run the tests if we execute this file directly
+if __name__ == '__main__':
+    unittest.main()
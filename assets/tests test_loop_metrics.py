@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from urllib.request import urlopen
+import loop_metrics # type: ignore
+from loop_metrics import Histogram, LoopMetrics, start_http_server, start_json_dump # type: ignore
+
+# Upper bound on the cost of one empty timed stage. Typical cost is a few
+# microseconds; the bound is loose so slow CI machines do not flake.
+STAGE_OVERHEAD_BUDGET = 50e-6
+
+
+# Define a test case class for the control loop metrics
+class TestLoopMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = LoopMetrics(prefix="t")
+
+    def test_histogram_buckets_are_cumulative(self):
+        """
+        Values land in the first bucket whose bound is >= the value, and the
+        snapshot reports cumulative counts ending in +Inf.
+        """
+        hist = Histogram((1.0, 2.0))
+        for value in (0.5, 1.0, 1.5, 3.0):
+            hist.observe(value)
+        snap = hist.snapshot()
+        self.assertEqual(snap["buckets"], [(1.0, 2), (2.0, 3), (float("inf"), 4)])
+        self.assertEqual(snap["count"], 4)
+        self.assertAlmostEqual(snap["sum"], 6.0)
+
+    def test_stage_is_timed_even_when_it_raises(self):
+        """
+        A stage that raises is still recorded and the exception propagates.
+        """
+        with self.metrics.stage("sensor_read"):
+            pass
+        with self.assertRaises(RuntimeError):
+            with self.metrics.stage("sensor_read"):
+                raise RuntimeError("bus error")
+        self.assertEqual(self.metrics.snapshot()["stages"]["sensor_read"]["count"], 2)
+
+    def test_loop_period_and_jitter(self):
+        """
+        Each tick after the first records the period and its distance from
+        the interval the previous iteration meant to wait.
+        """
+        with mock.patch.object(loop_metrics.time, "perf_counter", side_effect=[0.0, 1.25, 3.25]):
+            self.metrics.loop_tick(1.0)
+            self.metrics.loop_tick(2.0)
+            self.metrics.loop_tick()
+        snap = self.metrics.snapshot()
+        self.assertEqual(snap["loop_period"]["count"], 2)
+        self.assertAlmostEqual(snap["loop_period"]["sum"], 3.25)
+        self.assertEqual(snap["loop_jitter"]["count"], 2)
+        self.assertAlmostEqual(snap["loop_jitter"]["sum"], 0.25)
+
+    def test_prometheus_format(self):
+        """
+        Counters get a _total suffix and histograms carry le labels, _sum and _count.
+        """
+        self.metrics.inc("sensor_errors", 3)
+        with self.metrics.stage("lcd_write"):
+            pass
+        text = self.metrics.to_prometheus()
+        lines = text.splitlines()
+        self.assertTrue(text.endswith("\n"))
+        self.assertIn("# TYPE t_sensor_errors_total counter", lines)
+        self.assertIn("t_sensor_errors_total 3", lines)
+        self.assertIn("# TYPE t_stage_seconds histogram", lines)
+        self.assertIn('t_stage_seconds_bucket{stage="lcd_write",le="+Inf"} 1', lines)
+        self.assertIn('t_stage_seconds_count{stage="lcd_write"} 1', lines)
+        self.assertIn('t_loop_period_seconds_bucket{le="+Inf"} 0', lines)
+        self.assertIn("t_loop_jitter_seconds_count 0", lines)
+
+    def test_http_endpoint(self):
+        """
+        The endpoint serves the Prometheus text and 404s other paths.
+        """
+        self.metrics.inc("serial_errors")
+        server = start_http_server(self.metrics, 0)
+        try:
+            host, port = server.server_address[:2]
+            with urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                self.assertEqual(response.status, 200)
+                self.assertIn(b"t_serial_errors_total 1", response.read())
+            with self.assertRaises(Exception):
+                urlopen(f"http://{host}:{port}/other", timeout=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_busy_port_raises(self):
+        """
+        Binding a port that is already in use raises OSError for the caller to handle.
+        """
+        server = start_http_server(self.metrics, 0)
+        try:
+            with self.assertRaises(OSError):
+                start_http_server(self.metrics, server.server_address[1])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_json_dump_survives_write_errors(self):
+        """
+        The dump thread counts a failed write and keeps dumping afterwards.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "missing", "metrics.json")
+            stop = start_json_dump(self.metrics, path, interval=0.01)
+            try:
+                deadline = time.monotonic() + 5
+                while not self.metrics.counters.get("metrics_dump_errors") and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                self.assertGreater(self.metrics.counters.get("metrics_dump_errors", 0), 0)
+
+                os.mkdir(os.path.dirname(path))
+                while not os.path.exists(path) and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                with open(path) as f:
+                    self.assertIn("counters", json.load(f))
+            finally:
+                stop.set()
+
+    def test_stage_overhead(self):
+        """
+        Timing a stage stays cheap enough to leave on in production.
+        """
+        n = 20000
+        start = time.perf_counter()
+        for _ in range(n):
+            with self.metrics.stage("noop"):
+                pass
+        per_stage = (time.perf_counter() - start) / n
+        self.assertLess(per_stage, STAGE_OVERHEAD_BUDGET, f"{per_stage * 1e6:.1f} us per stage")
+
+# This allows us to run the tests if we execute this file directly
+if __name__ == '__main__':
+    unittest.main()
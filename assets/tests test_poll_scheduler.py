@@ -0,0 +1,92 @@
+import unittest
+from poll_scheduler import AdaptivePollScheduler # type: ignore
+from testing_helpers import FakeClock # type: ignore
+
+
+# Define a test case class for the adaptive polling scheduler
+class TestAdaptivePollScheduler(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Scheduler polling between 1 and 8 seconds, doubling while stable.
+        """
+        self.clock = FakeClock()
+        self.scheduler = AdaptivePollScheduler(
+            min_interval=1, max_interval=8, backoff=2,
+            stable_delta=0.2, near_band=1.0, clock=self.clock,
+        )
+
+    def test_backs_off_while_stable_and_caps(self):
+        """
+        A flat reading far from the set point doubles the interval up to max_interval.
+        The first reading has nothing to compare with, so it counts as moving.
+        """
+        intervals = [self.scheduler.record_reading(65.0, 72) for _ in range(6)]
+        self.assertEqual(intervals, [1, 2, 4, 8, 8, 8])
+
+    def test_moving_temperature_resets(self):
+        """
+        A change of at least stable_delta snaps back to min_interval.
+        """
+        for _ in range(4):
+            self.scheduler.record_reading(65.0, 72)
+        self.assertEqual(self.scheduler.record_reading(65.5, 72), 1)
+
+    def test_near_set_point_stays_fast(self):
+        """
+        Within near_band of the set point the interval never backs off.
+        """
+        intervals = [self.scheduler.record_reading(71.5, 72) for _ in range(5)]
+        self.assertEqual(intervals, [1] * 5)
+
+    def test_sensor_error_resets(self):
+        """
+        A failed read (-999.0) polls fast and forgets the last temperature,
+        so the next good reading is treated as moving.
+        """
+        for _ in range(4):
+            self.scheduler.record_reading(65.0, 72)
+        self.assertEqual(self.scheduler.record_reading(-999.0, 72), 1)
+        self.assertEqual(self.scheduler.record_reading(65.0, 72), 1)
+        self.assertEqual(self.scheduler.record_reading(65.0, 72), 2)
+
+    def test_wake_snaps_back_and_interrupts_wait(self):
+        """
+        wake() resets the interval and makes the next wait() return at once.
+        """
+        for _ in range(4):
+            self.scheduler.record_reading(65.0, 72)
+        self.scheduler.wake()
+        self.assertEqual(self.scheduler.interval, 1)
+        self.assertTrue(self.scheduler.wait())
+        self.assertEqual(self.scheduler.early_wakeups, 1)
+
+    def test_counters(self):
+        """
+        reads_avoided compares against one read per baseline interval and
+        wakeups_per_hour scales wake-ups by elapsed time.
+        """
+        self.scheduler.interval = 0.01  # keep the real wait() short
+        for _ in range(10):
+            self.scheduler.record_reading(65.0, 72)
+            self.scheduler.interval = 0.01
+            self.scheduler.wait()
+        self.clock.now = 100.0
+        self.assertEqual(self.scheduler.reads_avoided(), 90)
+        self.assertAlmostEqual(self.scheduler.wakeups_per_hour(), 10 * 36.0)
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["reads"], 10)
+        self.assertEqual(stats["wakeups"], 10)
+
+    def test_invalid_intervals(self):
+        """
+        Nonsensical interval or backoff settings are rejected up front.
+        """
+        with self.assertRaises(ValueError):
+            AdaptivePollScheduler(min_interval=5, max_interval=1)
+        with self.assertRaises(ValueError):
+            AdaptivePollScheduler(backoff=0.5)
+
+# This allows us to run the tests if we execute this file directly
+if __name__ == '__main__':
+    unittest.main()
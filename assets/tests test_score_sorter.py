@@ -1,5 +1,33 @@
+import random
 import unittest
-from student_score_sorter_enhanced import merge_sort, binary_search # type: ignore
+from collections import defaultdict
+from student_score_sorter_enhanced import merge_sort, quick_sort, binary_search, group_students_by_score # type: ignore
+from student_sort_engine import SortEngine # type: ignore
+
+
+def random_roster(rng, n, score_range=100, name_pool=None):
+    """
+    Build a random roster of (name, score) tuples.
+    A small score_range or name_pool forces many ties, which is where
+    stability and duplicate handling bugs show up.
+    """
+    names = name_pool or [f"S{i}" for i in range(n)]
+    return [(rng.choice(names), rng.randint(0, score_range)) for _ in range(n)]
+
+
+def edge_rosters(rng):
+    """
+    Yield hand-picked shapes plus randomized rosters of varied size and tie density.
+    """
+    yield []
+    yield [("Solo", 50)]
+    yield [("A", 70)] * 20
+    yield [(f"S{i}", i) for i in range(300)]            # presorted
+    yield [(f"S{i}", -i) for i in range(300)]           # reverse sorted
+    yield [(f"S{i}", i % 3) for i in range(300)]        # heavy duplicates
+    for _ in range(200):
+        n = rng.randint(0, 400)
+        yield random_roster(rng, n, score_range=rng.choice([1, 5, 100, 10**6]))
 
 # Define a test case class for the Student Score Sorter functions
 class TestScoreSorter(unittest.TestCase):
@@ -46,6 +74,121 @@ class TestScoreSorter(unittest.TestCase):
         result = binary_search(self.sorted_students, 100)
         self.assertIsNone(result)  # Nothing should be returned
 
+
+# Property-style checks over many randomized rosters, compared with Python built-ins
+class TestScoreSorterProperties(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Use a fixed seed so any failure can be reproduced exactly.
+        """
+        self.rng = random.Random(499)
+
+    def test_sorts_match_builtin_sorted_and_are_stable(self):
+        """
+        merge_sort and quick_sort must equal sorted(), which is stable, so this
+        checks both the order of scores and that tied students keep input order.
+        """
+        for roster in edge_rosters(self.rng):
+            expected = sorted(roster, key=lambda x: x[1])
+            with self.subTest(n=len(roster)):
+                self.assertEqual(merge_sort(roster), expected)
+                self.assertEqual(quick_sort(roster), expected)
+
+    def test_sorts_do_not_modify_input(self):
+        """
+        Sorting returns a new list and leaves the caller's roster untouched.
+        """
+        roster = random_roster(self.rng, 500, score_range=10)
+        original = list(roster)
+        merge_sort(roster)
+        quick_sort(roster)
+        self.assertEqual(roster, original)
+
+    def test_custom_key(self):
+        """
+        key= orders by any field, e.g. name, matching sorted() with the same key.
+        """
+        roster = random_roster(self.rng, 500, name_pool=["Ann", "Bo", "Cy", "Di"])
+        expected = sorted(roster, key=lambda x: x[0])
+        self.assertEqual(merge_sort(roster, key=lambda x: x[0]), expected)
+        self.assertEqual(quick_sort(roster, key=lambda x: x[0]), expected)
+
+    def test_binary_search_matches_brute_force(self):
+        """
+        binary_search returns the first record with the target score in sorted
+        order, or None exactly when no record has that score.
+        """
+        for roster in edge_rosters(self.rng):
+            data = merge_sort(roster)
+            scores = {score for _, score in data}
+            targets = list(scores)[:20] + [self.rng.randint(-10, 10**6) for _ in range(5)]
+            for target in targets:
+                expected = next((r for r in data if r[1] == target), None)
+                self.assertEqual(binary_search(data, target), expected)
+
+    def test_group_matches_brute_force(self):
+        """
+        Every student appears under their score, in input order, and nowhere else.
+        """
+        for roster in edge_rosters(self.rng):
+            expected = defaultdict(list)
+            for name, score in roster:
+                expected[score].append(name)
+            self.assertEqual(dict(group_students_by_score(roster)), dict(expected))
+
+    def test_engine_composite_order_matches_sorted(self):
+        """
+        SortEngine's multi-key orderings match sorted() with an equivalent key,
+        including a descending string key, and are served from cache when repeated.
+        """
+        fields = ("name", "math", "science")
+        names = ["Ann", "Bo", "Cy", "Di", "Ed"]
+        roster = [
+            (self.rng.choice(names), self.rng.randint(0, 5), self.rng.randint(0, 5))
+            for _ in range(2000)
+        ]
+        engine = SortEngine(roster, fields)
+
+        self.assertEqual(engine.order("-math", "name"), sorted(roster, key=lambda r: (-r[1], r[0])))
+        self.assertEqual(
+            engine.order("science", "-name"),
+            sorted(sorted(roster, key=lambda r: r[0], reverse=True), key=lambda r: r[2]),
+        )
+        sorts = engine.sorts
+        engine.order("-math", "name")
+        self.assertEqual(engine.sorts, sorts)
+
+        self.assertEqual(engine.search("math", 3), [r for r in roster if r[1] == 3])
+        expected = defaultdict(list)
+        for r in roster:
+            expected[(r[1], r[2])].append(r)
+        self.assertEqual(dict(engine.group_by("math", "science")), dict(expected))
+
+        engine.add(("Zed", 9, 9))
+        self.assertEqual(engine.order("-math", "name")[0], ("Zed", 9, 9))
+
+    def test_engine_order_without_keys_is_identity(self):
+        """
+        With no sort keys the records come back in their original order.
+        """
+        roster = [("Cy", 3), ("Ann", 1), ("Bo", 2)]
+        engine = SortEngine(roster, ("name", "score"))
+        self.assertEqual(engine.order(), roster)
+        self.assertEqual(engine.permutation(), [0, 1, 2])
+        self.assertEqual(engine.sorts, 0)
+
+    def test_engine_group_lookup_does_not_grow_cache(self):
+        """
+        group_by() returns a plain dict, so a missing value raises KeyError
+        instead of adding an empty group to the cached result.
+        """
+        engine = SortEngine([("Ann", 1), ("Bo", 2)], ("name", "score"))
+        groups = engine.group_by("score")
+        with self.assertRaises(KeyError):
+            groups[99]
+        self.assertEqual(sorted(engine.group_by("score")), [1, 2])
+
 # This allows us to run the tests if we execute this file directly
 if __name__ == '__main__':
     unittest.main()
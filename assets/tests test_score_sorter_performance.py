@@ -0,0 +1,182 @@
+import math
+import os
+import random
+import time
+import tracemalloc
+import unittest
+from collections import defaultdict
+from student_score_sorter_enhanced import merge_sort, quick_sort, binary_search, group_students_by_score # type: ignore
+
+# Largest roster to test. The default keeps a normal test run short;
+# set SORTER_TEST_MAX_N=2000000 for the full multi-million record run.
+MAX_N = int(os.environ.get("SORTER_TEST_MAX_N", "200000"))
+
+# Wall-clock budgets depend on the machine and its load, so they only run
+# when SORTER_TEST_BUDGETS=1 is set. Growth is checked by counting comparisons,
+# which is deterministic and always runs.
+RUN_TIME_BUDGETS = os.environ.get("SORTER_TEST_BUDGETS") == "1"
+
+# Budgets. Times are relative to Python's built-in sorted() on a same-size roster so
+# they hold on slow and fast machines alike; memory is extra bytes per record.
+TIME_FACTOR_BUDGET = 60       # sort time may be at most 60x sorted()
+GROWTH_BUDGET = 10            # comparisons(4n) / comparisons(n): ~4.8 for n log n, 16 for n²
+COMPARISONS_PER_N_LOG_N = 4   # comparisons may be at most 4 * n * log2(n)
+MEMORY_BYTES_PER_RECORD = 200
+
+SORTS = (merge_sort, quick_sort)
+
+
+def score(x):
+    return x[1]
+
+
+def roster_shapes(rng, n):
+    """
+    Roster shapes that expose different worst cases: random scores, presorted,
+    reverse sorted, and only a handful of distinct scores.
+    """
+    return {
+        "random": [(f"S{i}", rng.randint(0, 100)) for i in range(n)],
+        "presorted": [(f"S{i}", i) for i in range(n)],
+        "reversed": [(f"S{i}", n - i) for i in range(n)],
+        "few_distinct": [(f"S{i}", rng.randint(0, 3)) for i in range(n)],
+    }
+
+
+class CountingScore:
+    """
+    Wraps a score and counts every comparison made on it, so a sort's work
+    can be measured exactly instead of timed.
+    """
+    comparisons = 0
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        CountingScore.comparisons += 1
+        return self.value < other.value
+
+    def __le__(self, other):
+        CountingScore.comparisons += 1
+        return self.value <= other.value
+
+    def __gt__(self, other):
+        CountingScore.comparisons += 1
+        return self.value > other.value
+
+    def __eq__(self, other):
+        CountingScore.comparisons += 1
+        return self.value == other.value
+
+
+def count_comparisons(sort, roster):
+    CountingScore.comparisons = 0
+    sort(roster, key=lambda x: CountingScore(x[1]))
+    return CountingScore.comparisons
+
+
+def best_time(func, *args, repeat=3):
+    """
+    Best of several runs, which filters out scheduler noise.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# Large-scale correctness plus time and memory budgets for the sorter
+class TestScoreSorterPerformance(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Build the large rosters once and share them across tests.
+        """
+        cls.rng = random.Random(2024)
+        cls.rosters = roster_shapes(cls.rng, MAX_N)
+
+    def test_large_sorts_match_builtin(self):
+        """
+        At full size every sort still equals the stable built-in sorted().
+        """
+        for shape, roster in self.rosters.items():
+            expected = sorted(roster, key=score)
+            for sort in SORTS:
+                with self.subTest(sort=sort.__name__, shape=shape):
+                    self.assertEqual(sort(roster), expected)
+
+    @unittest.skipUnless(RUN_TIME_BUDGETS, "set SORTER_TEST_BUDGETS=1 to run wall-clock budgets")
+    def test_time_budget_against_builtin(self):
+        """
+        Each sort must stay within TIME_FACTOR_BUDGET of sorted() on every shape.
+        The baseline is sorted() on the random roster, since Timsort finishes
+        presorted input in linear time and would make an unfair yardstick.
+        """
+        baseline = best_time(lambda r: sorted(r, key=score), self.rosters["random"])
+        for shape, roster in self.rosters.items():
+            for sort in SORTS:
+                with self.subTest(sort=sort.__name__, shape=shape):
+                    elapsed = best_time(sort, roster, repeat=1)
+                    self.assertLess(
+                        elapsed, baseline * TIME_FACTOR_BUDGET,
+                        f"{sort.__name__} on {shape}: {elapsed:.3f}s vs sorted() {baseline:.3f}s",
+                    )
+
+    def test_growth_is_not_quadratic(self):
+        """
+        Quadrupling the input must not come close to the 16x more comparisons
+        of an O(n²) algorithm, and the total stays within a constant of
+        n log n. This is what catches quick_sort on presorted input.
+        """
+        n = 2000
+        for shape in ("random", "presorted", "reversed", "few_distinct"):
+            small = roster_shapes(random.Random(1), n)[shape]
+            large = roster_shapes(random.Random(1), n * 4)[shape]
+            for sort in SORTS:
+                with self.subTest(sort=sort.__name__, shape=shape):
+                    small_count = count_comparisons(sort, small)
+                    large_count = count_comparisons(sort, large)
+                    ratio = large_count / small_count
+                    self.assertLess(ratio, GROWTH_BUDGET, f"comparisons(4n)/comparisons(n) = {ratio:.1f}")
+                    self.assertLess(large_count, COMPARISONS_PER_N_LOG_N * 4 * n * math.log2(4 * n))
+
+    def test_memory_budget(self):
+        """
+        Peak extra memory per record stays bounded (measured with tracemalloc,
+        which slows allocation a lot, so a moderate roster is used).
+        """
+        n = min(MAX_N, 10000)
+        for shape, roster in roster_shapes(random.Random(3), n).items():
+            for sort in SORTS:
+                with self.subTest(sort=sort.__name__, shape=shape):
+                    tracemalloc.start()
+                    try:
+                        sort(roster)
+                        _, peak = tracemalloc.get_traced_memory()
+                    finally:
+                        tracemalloc.stop()
+                    self.assertLess(peak / n, MEMORY_BYTES_PER_RECORD)
+
+    def test_large_search_and_group_match_brute_force(self):
+        """
+        On the full random roster, search and grouping agree with a linear scan.
+        """
+        roster = self.rosters["random"]
+        data = merge_sort(roster)
+        for target in (-1, 0, 37, 100, 101):
+            expected = next((r for r in data if r[1] == target), None)
+            self.assertEqual(binary_search(data, target), expected)
+
+        expected = defaultdict(list)
+        for name, s in roster:
+            expected[s].append(name)
+        self.assertEqual(dict(group_students_by_score(roster)), dict(expected))
+
+# This allows us to run the tests if we execute this file directly
+if __name__ == '__main__':
+    unittest.main()
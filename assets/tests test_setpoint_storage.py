@@ -0,0 +1,84 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+import setpoint_storage # type: ignore
+from setpoint_storage import DebouncedSetpointWriter, load_setpoint, save_setpoint # type: ignore
+
+
+# Define a test case class for set point persistence
+class TestSetpointStorage(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Each test gets its own temporary directory and set point file.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "setpoint.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_load_default_when_missing_or_corrupt(self):
+        """
+        A missing or unreadable file falls back to the default.
+        """
+        self.assertEqual(load_setpoint(72, self.path), 72)
+        with open(self.path, "w") as f:
+            f.write("{not json")
+        self.assertEqual(load_setpoint(72, self.path), 72)
+
+    def test_save_round_trip_leaves_no_temp_files(self):
+        """
+        save_setpoint writes the value and renames its temp file into place.
+        """
+        save_setpoint(68, self.path)
+        save_setpoint(69, self.path)
+        self.assertEqual(load_setpoint(72, self.path), 69)
+        self.assertEqual(os.listdir(self.tmp.name), ["setpoint.json"])
+
+    def test_failed_save_keeps_previous_file(self):
+        """
+        If the write fails before the rename, the old value survives intact
+        and the temp file is removed.
+        """
+        save_setpoint(70, self.path)
+        with mock.patch.object(setpoint_storage.os, "fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                save_setpoint(99, self.path)
+        self.assertEqual(load_setpoint(72, self.path), 70)
+        self.assertEqual(os.listdir(self.tmp.name), ["setpoint.json"])
+
+    def test_rapid_requests_coalesce_into_one_write(self):
+        """
+        A burst of requests inside the quiet period produces a single write
+        of the last value.
+        """
+        writer = DebouncedSetpointWriter(self.path, quiet_period=0.1)
+        try:
+            for value in range(60, 80):
+                writer.request(value)
+            deadline = time.monotonic() + 2
+            while writer.writes == 0 and time.monotonic() < deadline:
+                time.sleep(0.02)
+            self.assertEqual(writer.writes, 1)
+            self.assertEqual(writer.requests, 20)
+            self.assertEqual(load_setpoint(72, self.path), 79)
+        finally:
+            writer.close()
+
+    def test_close_flushes_pending_value(self):
+        """
+        close() writes a value that is still inside its quiet period.
+        """
+        writer = DebouncedSetpointWriter(self.path, quiet_period=60)
+        writer.request(75)
+        writer.close()
+        self.assertEqual(load_setpoint(72, self.path), 75)
+        self.assertEqual(writer.writes, 1)
+        writer.close()  # Safe to call again
+
+# This allows us to run the tests if we execute this file directly
+if __name__ == '__main__':
+    unittest.main()
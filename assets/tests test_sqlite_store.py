@@ -0,0 +1,130 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from sqlite_store import ThermostatHistory # type: ignore
+
+HOUR = 3600
+
+
+# Define a test case class for the SQLite thermostat history
+class TestThermostatHistory(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Each test gets its own temporary database with a large batch size,
+        so rows are only written on an explicit flush.
+        """
+        self.tmp = tempfile.TemporaryDirectory()
+        self.history = ThermostatHistory(os.path.join(self.tmp.name, "history.db"),
+                                         batch_size=1000, max_delay=3600)
+
+    def tearDown(self):
+        self.history.close()
+        self.tmp.cleanup()
+
+    def rollup(self, name, bucket):
+        return self.history.conn.execute(
+            f"SELECT count, temp_sum, temp_min, temp_max, heat_count, cool_count "
+            f"FROM readings_{name} WHERE bucket = ?", (bucket,)
+        ).fetchone()
+
+    def test_rollup_upsert_across_batches(self):
+        """
+        Two batches landing in the same bucket are merged into one rollup row.
+        """
+        self.history.add("heat", 68.0, 72, ts=10)
+        self.history.add("heat", 70.0, 72, ts=20)
+        self.history.flush()
+        self.history.add("cool", 74.0, 72, ts=30)
+        self.history.add("off", 66.0, 72, ts=40)
+        self.history.flush()
+
+        self.assertEqual(self.rollup("minute", 0), (4, 278.0, 66.0, 74.0, 2, 1))
+        self.assertEqual(self.rollup("hour", 0), (4, 278.0, 66.0, 74.0, 2, 1))
+        count = self.history.conn.execute("SELECT COUNT(*) FROM readings_minute").fetchone()[0]
+        self.assertEqual(count, 1)
+
+    def test_query_bucket_bounds(self):
+        """
+        query() returns every bucket overlapping [start, end), with averages
+        and heat/cool fractions per bucket.
+        """
+        for hour in range(5):
+            self.history.add("heat", 60.0 + hour, 72, ts=hour * HOUR + 1)
+            self.history.add("off", 62.0 + hour, 72, ts=hour * HOUR + 2)
+
+        rows = self.history.query(1 * HOUR, 3 * HOUR)
+        self.assertEqual([r[0] for r in rows], [1 * HOUR, 2 * HOUR])
+        self.assertEqual(rows[0], (HOUR, 2, 62.0, 61.0, 63.0, 0.5, 0.0))
+
+        # Partial buckets at either end are included
+        rows = self.history.query(1 * HOUR + 100, 3 * HOUR + 0.5)
+        self.assertEqual([r[0] for r in rows], [1 * HOUR, 2 * HOUR, 3 * HOUR])
+
+        self.assertEqual(len(self.history.query(0, 5 * HOUR, "minute")), 5)
+        with self.assertRaises(ValueError):
+            self.history.query(0, HOUR, "day")
+
+    def test_raw_range(self):
+        """
+        raw() returns readings with start <= ts < end in time order,
+        including ones still pending.
+        """
+        for ts in (5, 1, 3, 2, 4):
+            self.history.add("cool", 70.0 + ts, 72, ts=ts)
+        self.assertEqual([r[0] for r in self.history.raw(2, 5)], [2, 3, 4])
+        self.assertEqual(self.history.raw(1, 2), [(1, "cool", 71.0, 72)])
+
+    def test_add_many(self):
+        """
+        add_many() accepts (ts, state, temp, set_point) records, such as decoded
+        telemetry, and writes them in one flush.
+        """
+        records = [(ts, "heat", 65.0, 70.0) for ts in range(0, 120, 10)]
+        self.history.add_many(records)
+        self.assertEqual(self.history.raw(0, 120), records)
+        self.assertEqual(self.rollup("minute", 1)[0], 6)
+
+    def test_failed_flush_keeps_batch(self):
+        """
+        If the transaction fails nothing is written and the readings are
+        written by the next successful flush.
+        """
+        conn = self.history.conn
+        conn.execute("CREATE TRIGGER fail BEFORE INSERT ON readings BEGIN SELECT RAISE(ABORT, 'disk full'); END")
+        self.history.add("heat", 68.0, 72, ts=1)
+        with self.assertRaises(sqlite3.Error):
+            self.history.flush()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM readings_minute").fetchone()[0], 0)
+
+        conn.execute("DROP TRIGGER fail")
+        self.history.add("heat", 69.0, 72, ts=2)
+        self.assertEqual([r[0] for r in self.history.raw(0, 10)], [1, 2])
+        self.assertEqual(self.rollup("minute", 0)[0], 2)
+
+    def test_backlog_is_capped_and_retries_are_spaced(self):
+        """
+        While writes keep failing, add() retries at most once per max_delay and
+        only the newest max_pending readings are kept.
+        """
+        history = ThermostatHistory(os.path.join(self.tmp.name, "capped.db"),
+                                    batch_size=2, max_delay=3600, max_pending=5)
+        try:
+            conn = history.conn
+            conn.execute("CREATE TRIGGER fail BEFORE INSERT ON readings BEGIN SELECT RAISE(ABORT, 'locked'); END")
+            history.add("heat", 60.0, 72, ts=0)
+            with self.assertRaises(sqlite3.Error):
+                history.add("heat", 61.0, 72, ts=1)
+            for ts in range(2, 10):
+                history.add("heat", 60.0 + ts, 72, ts=ts)  # Not retried yet, so no error
+            self.assertEqual(history.readings_dropped, 5)
+
+            conn.execute("DROP TRIGGER fail")
+            self.assertEqual([r[0] for r in history.raw(0, 10)], [5, 6, 7, 8, 9])
+        finally:
+            history.close()
+
+# This allows us to run the tests if we execute this file directly
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+import os
+import unittest
+from telemetry_protocol import (  # type: ignore
+    FrameDecoder, TelemetryBatcher, TelemetryRecord, encode_frame, read_stream
+)
+
+# Define a test case class for the binary serial telemetry protocol
+class TestTelemetryProtocol(unittest.TestCase):
+
+    def setUp(self):
+        """
+        Build a small batch of readings and encode it as one frame.
+        """
+        self.records = [
+            TelemetryRecord(1700000000, "heat", 68.4, 72.0),
+            TelemetryRecord(1700000001, "cool", 75.1, 71.5),
+            TelemetryRecord(1700000002, "off", -3.2, 72.0),
+        ]
+        self.frame = encode_frame(self.records, sequence=7)
+
+    def test_round_trip(self):
+        """
+        A single frame decodes back to the same readings.
+        """
+        decoded = FrameDecoder().feed(self.frame)
+        self.assertEqual(decoded, self.records)
+
+    def test_byte_at_a_time(self):
+        """
+        Frames split across many reads are reassembled.
+        """
+        decoder = FrameDecoder()
+        decoded = []
+        for b in self.frame * 3:
+            decoded.extend(decoder.feed(bytes([b])))
+        self.assertEqual(decoded, self.records * 3)
+
+    def test_corrupt_frame_is_skipped(self):
+        """
+        A frame with a bad CRC is dropped and the following frame still decodes.
+        Leading line noise is discarded.
+        """
+        bad = bytearray(self.frame)
+        bad[12] ^= 0xFF
+        decoder = FrameDecoder()
+        decoded = decoder.feed(b"noise" + bytes(bad) + encode_frame(self.records, sequence=8))
+        self.assertEqual(decoded, self.records)
+        self.assertEqual(decoder.crc_errors, 1)
+
+    def test_sequence_gap_counts_lost_frames(self):
+        """
+        Missing sequence numbers are reported as lost frames, including across the wrap.
+        """
+        decoder = FrameDecoder()
+        decoder.feed(encode_frame(self.records, 65534))
+        decoder.feed(encode_frame(self.records, 2))
+        self.assertEqual(decoder.lost_frames, 3)
+        self.assertEqual(decoder.sequence_resyncs, 0)
+
+    def test_restart_and_repeat_are_resyncs(self):
+        """
+        A thermostat restart (sequence back to 0) and a repeated frame are
+        counted as resyncs, not as ~65,000 lost frames.
+        """
+        decoder = FrameDecoder()
+        for sequence in (500, 501, 0, 1, 1):
+            self.assertEqual(decoder.feed(encode_frame(self.records, sequence)), self.records)
+        self.assertEqual(decoder.lost_frames, 0)
+        self.assertEqual(decoder.sequence_resyncs, 2)
+
+    def test_sub_second_timestamps(self):
+        """
+        Timestamps keep millisecond resolution, so several readings per
+        second stay distinct.
+        """
+        records = [TelemetryRecord(1700000000 + i * 0.25, "heat", 70.0, 72.0) for i in range(8)]
+        decoded = FrameDecoder().feed(encode_frame(records, 0))
+        self.assertEqual([r.timestamp for r in decoded], [r.timestamp for r in records])
+
+    def test_batcher_groups_readings(self):
+        """
+        The batcher writes one frame per batch_size readings and flushes the remainder.
+        """
+        class FakeSerial:
+            def __init__(self):
+                self.writes = []
+
+            def write(self, data):
+                self.writes.append(data)
+
+        port = FakeSerial()
+        batcher = TelemetryBatcher(port, batch_size=4, max_delay=3600)
+        for i in range(10):
+            batcher.add("heat", 70 + i / 10, 72, timestamp=i)
+        batcher.flush()
+        self.assertEqual(len(port.writes), 3)
+
+        decoded = FrameDecoder().feed(b"".join(port.writes))
+        self.assertEqual([r.timestamp for r in decoded], list(range(10)))
+
+    def test_frame_ending_in_sync_byte(self):
+        """
+        A frame whose last CRC byte equals the first sync byte is consumed once
+        and never counted as negative discarded bytes.
+        """
+        sequence = next(
+            s for s in range(1000) if encode_frame(self.records, s).endswith(b"\xAA")
+        )
+        frame = encode_frame(self.records, sequence)
+        decoder = FrameDecoder()
+        self.assertEqual(decoder.feed(frame), self.records)
+        self.assertEqual(decoder.discarded_bytes, 0)
+        self.assertEqual(decoder.feed(frame), self.records)
+        self.assertEqual(decoder.crc_errors, 0)
+
+    def test_failed_write_keeps_batch(self):
+        """
+        If the serial write raises, the queued readings are sent on the next flush.
+        """
+        class FlakySerial:
+            def __init__(self):
+                self.fail = True
+                self.writes = []
+
+            def write(self, data):
+                if self.fail:
+                    raise OSError("port gone")
+                self.writes.append(data)
+
+        port = FlakySerial()
+        batcher = TelemetryBatcher(port, batch_size=2, max_delay=3600)
+        batcher.add("heat", 70.0, 72, timestamp=1)
+        with self.assertRaises(OSError):
+            batcher.add("heat", 70.1, 72, timestamp=2)
+        port.fail = False
+        batcher.flush()
+        decoded = FrameDecoder().feed(b"".join(port.writes))
+        self.assertEqual([r.timestamp for r in decoded], [1, 2])
+
+    def test_long_outage_is_sent_in_frames(self):
+        """
+        After an outage longer than one frame can hold, the backlog is sent as
+        batch_size frames; beyond max_pending the oldest readings are dropped.
+        """
+        class FlakySerial:
+            def __init__(self):
+                self.fail = True
+                self.writes = []
+
+            def write(self, data):
+                if self.fail:
+                    raise OSError("port gone")
+                self.writes.append(data)
+
+        port = FlakySerial()
+        batcher = TelemetryBatcher(port, batch_size=10, max_delay=3600, max_pending=400)
+        for i in range(500):
+            try:
+                batcher.add("heat", 70.0, 72, timestamp=i)
+            except OSError:
+                pass
+        self.assertEqual(batcher.records_dropped, 100)
+
+        port.fail = False
+        batcher.flush()
+        self.assertEqual(len(port.writes), 40)
+        decoded = FrameDecoder().feed(b"".join(port.writes))
+        self.assertEqual([r.timestamp for r in decoded], list(range(100, 500)))
+        self.assertEqual(batcher.records_sent, 400)
+
+    @unittest.skipUnless(hasattr(os, "openpty"), "requires a pseudo-terminal")
+    def test_pty_loopback(self):
+        """
+        Frames written to one end of a pty are decoded from the other end.
+        """
+        import tty
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        try:
+            expected = []
+            with os.fdopen(master, "wb", buffering=0, closefd=False) as writer:
+                batcher = TelemetryBatcher(writer, batch_size=50, max_delay=3600)
+                for i in range(500):
+                    batcher.add("cool", 74.5, 72, timestamp=i)
+                    expected.append(i)
+                batcher.flush()
+
+            received = []
+            with os.fdopen(slave, "rb", buffering=0, closefd=False) as reader:
+                decoder = FrameDecoder()
+                while len(received) < len(expected):
+                    for record in decoder.feed(reader.read(4096)):
+                        received.append(record.timestamp)
+            self.assertEqual(received, expected)
+            self.assertEqual(decoder.lost_frames, 0)
+        finally:
+            os.close(master)
+            os.close(slave)
+
+    def test_read_stream_sink(self):
+        """
+        read_stream passes decoded batches to the sink until EOF.
+        """
+        import io
+        batches = []
+        decoder = read_stream(io.BytesIO(self.frame * 5), batches.append, chunk_size=10)
+        self.assertEqual(sum(len(b) for b in batches), 15)
+        self.assertEqual(decoder.frames, 5)
+
+# This allows us to run the tests if we execute this file directly
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import zone_manager # type: ignore
+from zone_manager import ThermostatZone, ZoneManager # type: ignore
+from poll_scheduler import AdaptivePollScheduler # type: ignore
+from setpoint_storage import load_setpoint # type: ignore
+from testing_helpers import FakeClock # type: ignore
+
+
+class FakeSensor:
+    """
+    Sensor with a fixed Celsius reading that logs each read as (bus, zone).
+    """
+
+    def __init__(self, name, bus, log, celsius=18.0):
+        self.name = name
+        self.bus = bus
+        self.log = log
+        self.celsius = celsius
+
+    @property
+    def temperature(self):
+        self.log.append((self.bus, self.name))
+        return self.celsius
+
+
+# Define a test case class for the multi-zone scheduler
+class TestZoneManager(unittest.TestCase):
+
+    def setUp(self):
+        """
+        A manager and zones all driven by the same virtual clock.
+        """
+        self.clock = FakeClock()
+        self.manager = ZoneManager(setpoint_flush_interval=5, clock=self.clock)
+        self.reads = []
+
+    def add_zone(self, name, bus="i2c-1", max_interval=8, **kwargs):
+        scheduler = AdaptivePollScheduler(
+            min_interval=1, max_interval=max_interval, backoff=2, clock=self.clock
+        )
+        zone = ThermostatZone(name, FakeSensor(name, bus, self.reads), scheduler=scheduler, **kwargs)
+        self.manager.add_zone(zone)
+        return zone
+
+    def tick(self, seconds=1.0):
+        self.clock.now += seconds
+        return self.manager.poll_once()
+
+    def test_due_ordering_and_backoff(self):
+        """
+        New zones are polled at once; a stable zone is then polled only when
+        its backed-off due time arrives (1, 2, 4 seconds later).
+        """
+        self.add_zone("a")
+        self.assertEqual(self.manager.poll_once(), 1)
+        polled_at = [0.0]
+        for _ in range(10):
+            if self.tick():
+                polled_at.append(self.clock.now)
+        self.assertEqual(polled_at, [0.0, 1.0, 3.0, 7.0])
+
+    def test_stale_entries_are_skipped(self):
+        """
+        Waking a zone several times leaves stale heap entries; it is still
+        read only once per pass and its old due time is ignored.
+        """
+        zone = self.add_zone("a")
+        self.manager.poll_once()
+        for _ in range(3):
+            self.tick()  # back off; the live due time is now t=7
+        reads = zone.reads
+        self.manager.wake_zone("a")
+        self.manager.wake_zone("a")
+        self.assertEqual(self.manager.poll_once(), 1)
+        self.assertEqual(self.manager.poll_once(), 0)
+        self.assertEqual(zone.reads, reads + 1)
+
+        # Next live due is t=5, then t=9; the stale t=7 entry must not add a read
+        self.assertEqual([self.tick() for _ in range(5)], [0, 1, 0, 0, 0])
+        self.assertEqual(zone.reads, reads + 2)
+
+    def test_state_change_polls_immediately(self):
+        """
+        cycle() and adjust_set_point() make the zone due now, not at its
+        backed-off due time.
+        """
+        zone = self.add_zone("a", max_interval=30)
+        self.manager.poll_once()
+        for _ in range(8):
+            self.tick()
+        reads = zone.reads
+        zone.cycle()
+        self.assertEqual(self.manager.poll_once(), 1)
+        zone.adjust_set_point(1)
+        self.assertEqual(self.manager.poll_once(), 1)
+        self.assertEqual(zone.reads, reads + 2)
+        self.assertEqual(zone.state, "heat")
+
+    def test_reads_are_batched_per_bus(self):
+        """
+        Due zones are grouped so each bus is visited once per pass, with that
+        bus's reads back to back.
+        """
+        for i in range(6):
+            self.add_zone(f"z{i}", bus=f"i2c-{i % 2}")
+        self.assertEqual(self.manager.poll_once(), 6)
+        self.assertEqual(self.manager.bus_batches, 2)
+        buses = [bus for bus, _ in self.reads]
+        self.assertEqual(buses, sorted(buses, key=buses.index))
+
+    def test_setpoint_flush(self):
+        """
+        Changed set points are saved on the flush interval; a failed save keeps
+        the zone dirty and is retried on the next flush.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "zone-a.json")
+            zone = self.add_zone("a", setpoint_path=path)
+            zone.adjust_set_point(2)
+
+            with mock.patch.object(zone_manager, "save_setpoint", side_effect=OSError("disk full")):
+                self.tick(5)
+            self.assertTrue(zone.setpoint_dirty)
+            self.assertEqual(self.manager.setpoint_save_errors, 1)
+
+            self.tick(5)
+            self.assertFalse(zone.setpoint_dirty)
+            self.assertEqual(load_setpoint(0, path), 74)
+
+# This allows us to run the tests if we execute this file directly
+if __name__ == '__main__':
+    unittest.main()
@@ -1,21 +1,36 @@
 # utils.py
 # Contains reusable helper functions to reduce code duplication
 
-from gpiozero import PWMLED
+from typing import TYPE_CHECKING, Optional
 
-def set_led_state(led: PWMLED, mode: str):
+if TYPE_CHECKING:
+    # Only needed for annotations; keeps this module importable without GPIO libraries
+    from gpiozero import PWMLED
+
+
+def set_led_state(led: "PWMLED", mode: str, current: Optional[str] = None):
     """
-    Set the state of a PWM LED.
+    Set the state of a PWM LED, skipping the hardware call if it is already in that mode.
+    The caller keeps the LED's last mode and passes it as current; re-sending
+    "pulse" would restart gpiozero's background PWM thread.
 
     Parameters:
     led (PWMLED): The LED to control
     mode (str): One of "on", "off", or "pulse"
+    current (str): The mode the LED was last set to, or None if unknown
+
+    Returns:
+    bool: True if the LED hardware was actually updated
     """
+    if mode not in ("on", "off", "pulse"):
+        raise ValueError("Invalid LED mode. Use 'on', 'off', or 'pulse'.")
+    if mode == current:
+        return False
+
     if mode == "pulse":
         led.pulse()
     elif mode == "on":
         led.on()
-    elif mode == "off":
-        led.off()
     else:
-        raise ValueError("Invalid LED mode. Use 'on', 'off', or 'pulse'.")
+        led.off()
+    return True
@@ -0,0 +1,332 @@
+# zone_manager.py
+# Runs many thermostat zones in one process.
+# Each zone has its own sensor backend, set point and heat/cool/off state;
+# a single scheduler thread batches due sensor reads per I2C bus.
+
+import heapq
+import random
+import time
+from collections import defaultdict
+from threading import Event, Lock, Thread
+
+from hysteresis_control import HysteresisController
+from poll_scheduler import AdaptivePollScheduler
+from setpoint_storage import load_setpoint, save_setpoint
+from utils import set_led_state
+from constants import DEBUG
+
+SENSOR_ERROR = -999.0
+ZONE_STATES = ("off", "heat", "cool")
+
+
+class SimulatedSensor:
+    """
+    Stand-in for an AHT20 that drifts slowly around a base temperature.
+    Exposes .temperature in Celsius like adafruit_ahtx0.AHTx0.
+    """
+
+    def __init__(self, base_c=21.0, drift=0.05, bus="i2c-1", seed=None):
+        self.bus = bus
+        self._temp = base_c
+        self._drift = drift
+        self._rng = random.Random(seed)
+
+    @property
+    def temperature(self):
+        self._temp += self._rng.uniform(-self._drift, self._drift)
+        return self._temp
+
+
+class ThermostatZone:
+    """
+    Headless thermostat for one room.
+
+    Mirrors TemperatureMachine: the state cycles off → heat → cool → off and
+    heat/cool demand comes from the same HysteresisController. LEDs are
+    optional so zones can be driven by simulated sensors.
+    """
+
+    def __init__(self, name, sensor, set_point=72, red_led=None, blue_led=None,
+                 setpoint_path=None, scheduler=None, control=None):
+        self.name = name
+        self.sensor = sensor
+        self.bus = getattr(sensor, "bus", "default")
+        self.setpoint_path = setpoint_path
+        self.set_point = load_setpoint(set_point, setpoint_path) if setpoint_path else set_point
+        self.red_led = red_led
+        self.blue_led = blue_led
+        self.scheduler = scheduler or AdaptivePollScheduler()
+        self.control = control or HysteresisController()
+        self.state = "off"
+        self.temp = SENSOR_ERROR
+        self.led_modes = ("off", "off")
+        self.setpoint_dirty = False
+        self.manager = None  # Set by ZoneManager.add_zone()
+
+        # Per-zone metrics
+        self.reads = 0
+        self.sensor_errors = 0
+        self.read_time = 0.0
+        self.control_time = 0.0
+
+    def cycle(self):
+        """
+        Advance to the next thermostat state.
+        """
+        self.state = ZONE_STATES[(ZONE_STATES.index(self.state) + 1) % len(ZONE_STATES)]
+        self._request_poll()
+
+    def adjust_set_point(self, delta):
+        """
+        Change the set point; the manager saves it on its next flush.
+        """
+        self.set_point += delta
+        self.setpoint_dirty = True
+        self._request_poll()
+
+    def _request_poll(self):
+        # Ask the manager to poll this zone now instead of at its backed-off due time
+        if self.manager is not None:
+            self.manager.wake_zone(self.name)
+        else:
+            self.scheduler.wake()
+
+    def read_sensor(self):
+        """
+        Read the sensor in Fahrenheit, returning SENSOR_ERROR on failure.
+        """
+        start = time.perf_counter()
+        try:
+            temp = (self.sensor.temperature * 9 / 5) + 32
+        except Exception:
+            self.sensor_errors += 1
+            temp = SENSOR_ERROR
+        self.reads += 1
+        self.read_time += time.perf_counter() - start
+        return temp
+
+    def apply_reading(self, temp):
+        """
+        Update state outputs for a new reading and return the next poll interval.
+        """
+        start = time.perf_counter()
+        self.temp = temp
+        self.control.update(self.state, temp, self.set_point)
+        red, blue = self.control.led_modes()
+
+        if (red, blue) != self.led_modes:
+            if self.red_led is not None and self.blue_led is not None:
+                set_led_state(self.red_led, red, self.led_modes[0])
+                set_led_state(self.blue_led, blue, self.led_modes[1])
+            self.led_modes = (red, blue)
+
+        interval = self.scheduler.record_reading(temp, self.set_point)
+        self.control_time += time.perf_counter() - start
+        return interval
+
+    def metrics(self):
+        """
+        Return a dictionary snapshot of this zone's metrics.
+        """
+        return {
+            "zone": self.name,
+            "state": self.state,
+            "demand": self.control.demand,
+            "switches": self.control.switches,
+            "temp": round(self.temp, 1),
+            "set_point": self.set_point,
+            "reads": self.reads,
+            "sensor_errors": self.sensor_errors,
+            "read_time": self.read_time,
+            "control_time": self.control_time,
+            "poll_interval": self.scheduler.interval,
+        }
+
+
+class ZoneManager:
+    """
+    Hosts many ThermostatZone objects behind one scheduler thread.
+
+    Zones are kept in a heap ordered by their next due time. Each pass pops
+    every due zone, groups them by sensor bus and reads each group while
+    holding that bus's lock once, so hundreds of zones cost one wake-up
+    instead of one thread each.
+    """
+
+    def __init__(self, setpoint_flush_interval=5.0, clock=time.monotonic):
+        self.zones = {}
+        self._clock = clock
+        self._due = []      # heap of (due_time, order, zone_name)
+        self._next_due = {}  # zone_name -> due_time of its live heap entry
+        self._order = 0
+        self._bus_locks = defaultdict(Lock)
+        self._lock = Lock()
+        self._stop = Event()
+        self._wake = Event()
+        self._thread = None
+        self.setpoint_flush_interval = setpoint_flush_interval
+        self._last_flush = clock()
+
+        # Manager metrics
+        self.passes = 0
+        self.bus_batches = 0
+        self.setpoint_save_errors = 0
+
+    def add_zone(self, zone):
+        """
+        Register a zone; it is polled on the next pass.
+        """
+        with self._lock:
+            if zone.name in self.zones:
+                raise ValueError(f"Zone {zone.name!r} already exists.")
+            self.zones[zone.name] = zone
+            zone.manager = self
+            self._push(zone.name, self._clock())
+
+    def _push(self, name, due):
+        # Older heap entries for this zone become stale and are skipped when popped
+        self._next_due[name] = due
+        heapq.heappush(self._due, (due, self._order, name))
+        self._order += 1
+
+    def poll_once(self, now=None):
+        """
+        Read and update every zone that is due. Returns the number of zones polled.
+        """
+        now = self._clock() if now is None else now
+        by_bus = defaultdict(list)
+        with self._lock:
+            while self._due and self._due[0][0] <= now:
+                due, _, name = heapq.heappop(self._due)
+                if self._next_due.get(name) != due:
+                    continue
+                del self._next_due[name]
+                zone = self.zones[name]
+                by_bus[zone.bus].append(zone)
+
+        polled = 0
+        for bus, zones in by_bus.items():
+            with self._bus_locks[bus]:
+                readings = [zone.read_sensor() for zone in zones]
+            self.bus_batches += 1
+            next_due = []
+            for zone, temp in zip(zones, readings):
+                next_due.append((now + zone.apply_reading(temp), zone.name))
+            with self._lock:
+                for due, name in next_due:
+                    self._push(name, due)
+            polled += len(zones)
+
+        self.passes += 1
+        if now - self._last_flush >= self.setpoint_flush_interval:
+            self.flush_setpoints()
+            self._last_flush = now
+        return polled
+
+    def wake_zone(self, name):
+        """
+        Make a zone due immediately, e.g. after a button press.
+        """
+        with self._lock:
+            self.zones[name].scheduler.wake()
+            self._push(name, self._clock())
+        self._wake.set()
+
+    def flush_setpoints(self):
+        """
+        Save set points of zones that changed since the last flush.
+        A zone whose save fails stays dirty and is retried on the next flush.
+        """
+        for zone in list(self.zones.values()):
+            if zone.setpoint_dirty and zone.setpoint_path:
+                zone.setpoint_dirty = False
+                try:
+                    save_setpoint(zone.set_point, zone.setpoint_path)
+                except OSError as e:
+                    zone.setpoint_dirty = True
+                    self.setpoint_save_errors += 1
+                    if DEBUG:
+                        print(f"Set point save failed for {zone.name}: {e}")
+
+    def next_wait(self):
+        """
+        Seconds until the earliest zone is due.
+        """
+        with self._lock:
+            if not self._due:
+                return 1.0
+            return max(0.0, self._due[0][0] - self._clock())
+
+    def start(self):
+        """
+        Run the scheduler in a background thread.
+        """
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the scheduler thread and save any pending set points.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush_setpoints()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.poll_once()
+            self._wake.wait(self.next_wait())
+            self._wake.clear()
+
+    def metrics(self):
+        """
+        Return per-zone metrics plus manager totals.
+        """
+        zones = [zone.metrics() for zone in self.zones.values()]
+        return {
+            "zones": zones,
+            "passes": self.passes,
+            "bus_batches": self.bus_batches,
+            "total_reads": sum(z["reads"] for z in zones),
+            "total_sensor_errors": sum(z["sensor_errors"] for z in zones),
+            "setpoint_save_errors": self.setpoint_save_errors,
+        }
+
+
+def benchmark(zone_counts=(10, 100, 500, 1000), rounds=200, buses=4):
+    """
+    Drive simulated zones through a virtual clock and report CPU cost per zone-read.
+    Returns a list of (zones, reads, microseconds per read) tuples.
+    """
+    results = []
+    for count in zone_counts:
+        clock = [0.0]
+        manager = ZoneManager(clock=lambda: clock[0])
+        for i in range(count):
+            sensor = SimulatedSensor(base_c=18 + (i % 8), bus=f"i2c-{i % buses}", seed=i)
+            manager.add_zone(ThermostatZone(
+                f"zone-{i}", sensor, set_point=70,
+                scheduler=AdaptivePollScheduler(clock=lambda: clock[0]),
+                control=HysteresisController(clock=lambda: clock[0]),
+            ))
+            if i % 3:
+                manager.zones[f"zone-{i}"].cycle()
+
+        start = time.process_time()
+        reads = 0
+        for _ in range(rounds):
+            reads += manager.poll_once()
+            clock[0] += 1.0
+        elapsed = time.process_time() - start
+        results.append((count, reads, elapsed / max(reads, 1) * 1e6))
+    return results
+
+
+# Simulated-sensor benchmark: per-zone cost should stay flat as zones grow
+if __name__ == "__main__":
+    print(f"{'zones':>6} {'reads':>8} {'us/read':>8}")
+    for count, reads, per_read in benchmark():
+        print(f"{count:>6} {reads:>8} {per_read:>8.2f}")